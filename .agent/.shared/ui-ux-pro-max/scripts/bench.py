@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Benchmarks - reproducible latency and memory measurements for
+the search and design-system pipeline.
+
+Usage:
+    python bench.py                                  # bundled data + 100x synthetic corpus
+    python bench.py --iterations 50 --scale 20
+    python bench.py --save baseline.json             # record a baseline
+    python bench.py --compare baseline.json          # exit 1 on regressions
+
+Each entry point (search, search_stack, DesignSystemGenerator.generate and
+its parallel=True mode, format_master_md and its streaming write_master_md)
+is timed cold (in-process indexes and result cache dropped before every call,
+indexes reloaded from disk) and warm (indexes resident, result cache
+cleared so scoring is measured). Latency is reported as p50/p95
+in milliseconds, memory as the tracemalloc peak of a single call.
+Every mode builds its indexes (and --startup its bytecode, from a copy of
+the scripts) in a temporary directory, so a run leaves .index/ and
+__pycache__/ in the tree untouched.
+topk_exhaustive/topk_maxscore time top-k BM25 scoring on the pure-Python
+engine over every domain index, without and with MaxScore pruning.
+
+startup/import times the imports of a plain `search.py "<query>"` with
+-X importtime (interpreter startup excluded), after byte-compiling the scripts
+and one untimed run per query that builds indexes and row stores. Its budget
+is IMPORT_BUDGET_RATIO times IMPORT_REFERENCE's import time, measured in the
+same run, so it holds on fast and slow machines alike. It is a regression
+when its p50 exceeds the budget or when a module that search.py defers gets
+imported; `python bench.py --startup` runs only that check.
+
+`python bench.py --parity` asserts that the python and numpy BM25 engines
+return identical score_tokens() output on every bundled CSV (flat and
+field-weighted indexes, k in None/3/10) and exits 1 on any difference.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.dont_write_bytecode = True  # benchmarking leaves the tree as it found it: no __pycache__/ here
+import core
+import design_system
+
+# ============ CONFIGURATION ============
+QUERIES = [
+    "saas dashboard", "glassmorphism dark", "minimal clean elegant", "fintech crypto trust",
+    "animation accessibility", "hero landing conversion", "beauty spa wellness", "ecommerce luxury",
+    "bar chart trend", "playful kids education", "healthcare app calm", "gaming neon"
+]
+STACK_QUERIES = ["layout responsive form", "state management", "image lazy loading", "navigation", "animation"]
+STACK = "html-tailwind"
+DEFAULT_ITERATIONS = 20
+DEFAULT_SCALE = 100
+DEFAULT_THRESHOLD = 0.20  # relative p50 slowdown reported as a regression
+IMPORT_REFERENCE = "import argparse, pathlib, re"  # stdlib imports timed alongside search.py, same machine and run
+IMPORT_BASELINE_RATIO = 1.63  # plain `search.py "<query>"` imports / IMPORT_REFERENCE, before the daemon work
+IMPORT_BUDGET_RATIO = round(IMPORT_BASELINE_RATIO * (1 + DEFAULT_THRESHOLD), 2)
+STARTUP_MIN_ITERATIONS = 15  # import timings are noisy; fewer samples make the budget check flaky
+PARITY_QUERIES = 200  # random vocabulary queries per index in --parity
+PARITY_K = (None, 3, 10)
+DEFERRED_MODULES = ("design_system", "daemon_server", "socketserver", "socket", "tempfile", "difflib",
+                    "concurrent.futures", "threading", "json", "csv")
+
+
+# ============ DATASETS ============
+def build_synthetic_data(scale, target_dir):
+    """Copy data/ into target_dir with every search CSV repeated `scale` times
+
+    Each copy tags its first column with the copy number so repeated rows are
+    distinct documents rather than exact duplicates.
+    """
+    target_dir = Path(target_dir)
+    shutil.copytree(core.DATA_DIR, target_dir, dirs_exist_ok=True)
+    scaled_files = [cfg["file"] for cfg in core.CSV_CONFIG.values()]
+    scaled_files += [cfg["file"] for cfg in core.STACK_CONFIG.values()]
+    for name in scaled_files:
+        source = core.DATA_DIR / name
+        if not source.exists():
+            continue
+        with open(source, 'r', encoding='utf-8', newline='') as f:
+            header, *rows = list(csv.reader(f))
+        with open(target_dir / name, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for copy in range(scale):
+                for row in rows:
+                    if copy and row:
+                        row = [f"{row[0]} v{copy}"] + row[1:]
+                    writer.writerow(row)
+    return target_dir
+
+
+def use_dataset(data_dir, index_dir):
+    """Point core and design_system at another data directory and index cache"""
+    core.DATA_DIR = Path(data_dir)
+    core.INDEX_DIR = Path(index_dir)
+    design_system.DATA_DIR = core.DATA_DIR
+    design_system.INDEX_DIR = core.INDEX_DIR
+    reset(cold=True)
+
+
+def reset(cold):
+    """Drop result caches, and in-process indexes too for a cold run"""
+    if cold:
+        core.invalidate_indexes()
+    core.clear_cache()
+
+
+# ============ MEASUREMENT ============
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def measure(fn, inputs, iterations, cold):
+    """Time fn over the inputs round-robin and record the peak memory of one call"""
+    reset(cold)
+    fn(inputs[0])  # load indexes for warm runs, and the interpreter's own lazy imports
+
+    timings = []
+    for i in range(iterations):
+        reset(cold)
+        start = time.perf_counter()
+        fn(inputs[i % len(inputs)])
+        timings.append((time.perf_counter() - start) * 1000)
+
+    reset(cold)
+    tracemalloc.start()
+    fn(inputs[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+
+def bench_dataset(label, iterations):
+    """Run every entry point cold and warm against the active dataset"""
+    start = time.perf_counter()
+    core.build_indexes()
+    results = {f"{label}/build_indexes": {"total_ms": round((time.perf_counter() - start) * 1000, 1)}}
+
+    generator = design_system.DesignSystemGenerator()
+    parallel_generator = design_system.DesignSystemGenerator(parallel=True)
+    sample = generator.generate(QUERIES[0], "Benchmark")
+    cases = {
+        "search": (lambda q: core.search(q), QUERIES),
+        "search_stack": (lambda q: core.search_stack(q, STACK), STACK_QUERIES),
+        "generate": (lambda q: generator.generate(q, "Benchmark"), QUERIES),
+        "generate_parallel": (lambda q: parallel_generator.generate(q, "Benchmark"), QUERIES),
+    }
+    for name, (fn, inputs) in cases.items():
+        for mode in ("cold", "warm"):
+            results[f"{label}/{name}/{mode}"] = measure(fn, inputs, iterations, cold=(mode == "cold"))
+            print(f"  {label}/{name}/{mode}: {results[f'{label}/{name}/{mode}']}", file=sys.stderr)
+
+    results[f"{label}/format_master_md/warm"] = measure(lambda ds: design_system.format_master_md(ds), [sample], iterations, cold=False)
+    with open(os.devnull, 'w', encoding='utf-8') as sink:
+        results[f"{label}/write_master_md/warm"] = measure(lambda ds: design_system.write_master_md(ds, sink), [sample], iterations, cold=False)
+    results.update(bench_pruning(label, iterations))
+    return results
+
+
+def bench_pruning(label, iterations):
+    """Top-k scoring on the Python engine with and without MaxScore pruning"""
+    indexes = [core.get_index(core.DATA_DIR / cfg["file"], cfg["search_cols"])
+               for cfg in core.CSV_CONFIG.values() if (core.DATA_DIR / cfg["file"]).exists()]
+    queries = [core.DEFAULT_TOKENIZER(query) for query in QUERIES]
+
+    def score_all(query_tokens):
+        for index in indexes:
+            index.bm25.score_tokens(query_tokens, core.MAX_RESULTS)
+
+    results = {}
+    engines, pruning = [index.bm25.engine for index in indexes], core.TOPK_PRUNING
+    try:
+        for index in indexes:
+            index.bm25.engine = "python"
+        for name, enabled in (("exhaustive", False), ("maxscore", True)):
+            core.TOPK_PRUNING = enabled
+            results[f"{label}/topk_{name}/warm"] = measure(score_all, queries, iterations, cold=False)
+    finally:
+        core.TOPK_PRUNING = pruning
+        for index, engine in zip(indexes, engines):
+            index.bm25.engine = engine
+
+    speedup = results[f"{label}/topk_exhaustive/warm"]["p50_ms"] / max(results[f"{label}/topk_maxscore/warm"]["p50_ms"], 1e-6)
+    print(f"  {label}/topk: exhaustive / MaxScore p50 = {speedup:.1f}x", file=sys.stderr)
+    return results
+
+
+def _import_times(args, env):
+    """Top-level cumulative import times (ms) by module for one `python -X importtime` run"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True,
+                            cwd=Path(__file__).parent, env=env).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(cumulative) / 1000) if not name.startswith("  ") else None
+    return times
+
+
+def bench_startup(iterations):
+    """Import cost of a plain `search.py "<query>"`, budgeted relative to IMPORT_REFERENCE"""
+    with tempfile.TemporaryDirectory(prefix="uipro-startup-") as tmp:
+        # A copy of the scripts beside a link to the real data: its bytecode,
+        # indexes and row stores land in tmp, never in the tree
+        scripts_dir = Path(tmp) / "scripts"
+        shutil.copytree(Path(__file__).parent, scripts_dir, ignore=shutil.ignore_patterns("__pycache__"))
+        os.symlink(core.DATA_DIR.resolve(), Path(tmp) / "data", target_is_directory=True)
+        env = dict(os.environ, UI_PRO_MAX_SOCKET=os.devnull + ".absent")  # never talk to a running daemon
+        interpreter = set(_import_times(["-c", "pass"], env))
+        # Bytecode is written even under PYTHONDONTWRITEBYTECODE, and an untimed run per query
+        # builds indexes and row stores, so only imports are measured
+        subprocess.run([sys.executable, "-m", "compileall", "-q", "-l", str(scripts_dir)], env=env, check=True)
+        for query in QUERIES:
+            _import_times([str(scripts_dir / "search.py"), query], env)
+        timings, reference, deferred = [], [], set()
+        for i in range(max(iterations, STARTUP_MIN_ITERATIONS)):
+            # Interleaved so machine speed and load drift affect both series alike
+            times = _import_times([str(scripts_dir / "search.py"), QUERIES[i % len(QUERIES)]], env)
+            timings.append(sum(ms for name, ms in times.items() if ms is not None and name not in interpreter))
+            deferred.update(name for name in DEFERRED_MODULES if name in times)
+            times = _import_times(["-c", IMPORT_REFERENCE], env)
+            reference.append(sum(ms for name, ms in times.items() if ms is not None and name not in interpreter))
+
+    reference_ms = percentile(reference, 50)
+    stats = {
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "reference_ms": round(reference_ms, 3),
+        "budget_ms": round(reference_ms * IMPORT_BUDGET_RATIO, 3),
+        "deferred_imported": sorted(deferred)
+    }
+    print(f"  startup/import: {stats}", file=sys.stderr)
+    return {"startup/import": stats}
+
+
+# ============ ENGINE PARITY ============
+def check_parity(queries_per_index=PARITY_QUERIES, seed=1):
+    """Compare the python and numpy engines' score_tokens() on every bundled CSV; returns the mismatches"""
+    original = (core.DATA_DIR, core.INDEX_DIR)
+    with tempfile.TemporaryDirectory(prefix="uipro-parity-") as tmp:
+        try:
+            use_dataset(original[0], Path(tmp) / "index")
+            return _check_parity(queries_per_index, seed)
+        finally:
+            use_dataset(*original)
+
+
+def _check_parity(queries_per_index, seed):
+    configs = [cfg for cfg in core.CSV_CONFIG.values()]
+    configs += [core._stack_config(stack) for stack in core.STACK_CONFIG]
+    rng = random.Random(seed)
+    mismatches, checked = [], 0
+    for config in configs:
+        filepath = core.DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        for scoring in core.SCORING_MODES:
+            bm25 = core.load_index(filepath, config["search_cols"], core.field_weights(config, scoring)).bm25
+            vocab = list(bm25.vocab)
+            queries = [rng.sample(vocab, rng.randint(1, min(5, len(vocab)))) for _ in range(queries_per_index)]
+            queries += [core.DEFAULT_TOKENIZER(query) for query in QUERIES + STACK_QUERIES]
+            engine = bm25.engine
+            try:
+                for query_tokens in queries:
+                    for k in PARITY_K:
+                        bm25.engine = "python"
+                        expected = bm25.score_tokens(query_tokens, k)
+                        bm25.engine = "numpy"
+                        actual = bm25.score_tokens(query_tokens, k)
+                        checked += 1
+                        if actual != expected:
+                            mismatches.append({"file": config["file"], "scoring": scoring, "query": query_tokens, "k": k})
+            finally:
+                bm25.engine = engine
+    print(f"  parity: {checked} comparisons, {len(mismatches)} mismatches", file=sys.stderr)
+    return mismatches
+
+
+def run_benchmarks(iterations=DEFAULT_ITERATIONS, scale=DEFAULT_SCALE):
+    """Benchmark the bundled data and a scale-times synthetic copy of it"""
+    original = (core.DATA_DIR, core.INDEX_DIR)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "scale": scale,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+        },
+        "results": bench_startup(iterations)
+    }
+    with tempfile.TemporaryDirectory(prefix="uipro-bench-") as tmp:
+        tmp = Path(tmp)
+        try:
+            use_dataset(original[0], tmp / "index-bundled")
+            report["results"].update(bench_dataset("bundled", iterations))
+            if scale > 1:
+                data_dir = build_synthetic_data(scale, tmp / "data-scaled")
+                use_dataset(data_dir, tmp / "index-scaled")
+                report["results"].update(bench_dataset(f"scaled{scale}x", iterations))
+        finally:
+            use_dataset(*original)
+    return report
+
+
+# ============ REPORTING ============
+def format_report(report, baseline=None, threshold=DEFAULT_THRESHOLD):
+    """Render results as a table; returns (text, list of regressed case names)"""
+    lines = [f"{'case':<40} {'p50 ms':>10} {'p95 ms':>10} {'peak KB':>10} {'vs base':>9}"]
+    regressions = []
+    base_results = (baseline or {}).get("results", {})
+    for name, stats in report["results"].items():
+        if "total_ms" in stats:
+            lines.append(f"{name:<40} {stats['total_ms']:>10} {'':>10} {'':>10}")
+            continue
+        delta = ""
+        if "budget_ms" in stats and (stats["p50_ms"] > stats["budget_ms"] or stats["deferred_imported"]):
+            regressions.append(name)
+            delta = "budget !"
+        base = base_results.get(name)
+        if base and base.get("p50_ms"):
+            change = (stats["p50_ms"] - base["p50_ms"]) / base["p50_ms"]
+            delta = f"{change:+.0%}"
+            if change > threshold:
+                regressions.append(name)
+                delta += " !"
+        lines.append(f"{name:<40} {stats['p50_ms']:>10} {stats['p95_ms']:>10} {stats.get('peak_kb', ''):>10} {delta:>9}")
+    return "\n".join(lines), regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max Benchmarks")
+    parser.add_argument("--iterations", "-i", type=int, default=DEFAULT_ITERATIONS, help="Timed calls per case (default: 20)")
+    parser.add_argument("--scale", type=int, default=DEFAULT_SCALE, help="Synthetic corpus multiplier, 1 to skip (default: 100)")
+    parser.add_argument("--save", type=str, default=None, help="Write results to a baseline JSON file")
+    parser.add_argument("--compare", type=str, default=None, help="Compare against a saved baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="p50 slowdown counted as a regression (default: 0.20)")
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    parser.add_argument("--startup", action="store_true", help="Only check search.py's import budget")
+    parser.add_argument("--parity", action="store_true", help="Only check that the python and numpy engines score identically")
+
+    args = parser.parse_args()
+
+    if args.parity:
+        if core._numpy() is None:
+            parser.exit(1, "Error: --parity needs NumPy installed\n")
+        mismatches = check_parity()
+        for mismatch in mismatches[:20]:
+            print(f"❌ {mismatch['file']} [{mismatch['scoring']}] k={mismatch['k']}: {' '.join(mismatch['query'])}")
+        if mismatches:
+            sys.exit(1)
+        print("✅ python and numpy engines agree")
+        sys.exit(0)
+
+    if args.startup:
+        report = {"meta": {"python": platform.python_version(), "iterations": args.iterations}, "results": bench_startup(args.iterations)}
+    else:
+        report = run_benchmarks(args.iterations, args.scale)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    text, regressions = format_report(report, baseline, args.threshold)
+    if not args.json:
+        print(text)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) (p50 over {args.threshold:.0%}, or import budget): {', '.join(regressions)}")
+        sys.exit(1)
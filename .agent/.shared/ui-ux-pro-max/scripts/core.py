@@ -4,70 +4,107 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
-import csv
+import os
+import pickle
 import re
+import sys
+import zlib
+from _thread import allocate_lock  # threading's Lock without importing threading
+from array import array
+from bisect import bisect_left
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import OrderedDict
+
+# csv, hashlib, heapq, io, json, mmap and struct are imported by the functions that use
+# them: a plain search only loads what its code path touches
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
+INDEX_DIR = Path(__file__).parent.parent / ".index"
+INDEX_VERSION = 12
 MAX_RESULTS = 3
+NUMPY_MIN_DOCS = 5000  # "auto" engine switches to NumPy scoring at this corpus size
+TOPK_PRUNING = True    # MaxScore pruning for top-k queries on the Python engine
+PRUNE_MIN_DOCS = 1000  # below this, pruning bookkeeping costs more than it saves
+PRUNE_SLACK = 1e-9     # relative margin keeping float rounding from pruning a true top-k document
+RESULT_CACHE_SIZE = 512
+STACK_WORKERS = 8  # threads search_stacks uses to load cold stack indexes
+RESULT_CACHE_ENV = "UI_PRO_MAX_RESULT_CACHE"  # "1" or a file path enables on-disk persistence
+SCORING = os.environ.get("UI_PRO_MAX_SCORING", "bm25")  # "bm25" (flat) or "bm25f" (field-weighted)
+SCORING_MODES = ("bm25", "bm25f")
+DEFAULT_FIELD_WEIGHT = 1.0  # BM25F weight of a search column without a "weights" entry
+FUZZY_MATCHING = True        # expand query tokens missing from an index to close vocabulary terms
+FUZZY_MIN_LENGTH = 5         # shorter unknown tokens are left alone
+FUZZY_EDITS = ((6, 1), (9, 2))  # (token length, edits allowed): short words have too many 1-edit neighbours
+FUZZY_PREFIX_COVERAGE = 0.6  # share of a term an unknown token must cover to complete to it
+FUZZY_MAX_EXPANSIONS = 2     # vocabulary terms substituted for one unknown token
 
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
         "search_cols": ["Style Category", "Keywords", "Best For", "Type"],
+        "weights": {"Style Category": 3.0, "Keywords": 2.0, "Type": 0.5},
         "output_cols": ["Style Category", "Type", "Keywords", "Primary Colors", "Effects & Animation", "Best For", "Performance", "Accessibility", "Framework Compatibility", "Complexity"]
     },
     "prompt": {
         "file": "prompts.csv",
         "search_cols": ["Style Category", "AI Prompt Keywords (Copy-Paste Ready)", "CSS/Technical Keywords"],
+        "weights": {"Style Category": 3.0, "AI Prompt Keywords (Copy-Paste Ready)": 1.5},
         "output_cols": ["Style Category", "AI Prompt Keywords (Copy-Paste Ready)", "CSS/Technical Keywords", "Implementation Checklist"]
     },
     "color": {
         "file": "colors.csv",
         "search_cols": ["Product Type", "Keywords", "Notes"],
+        "weights": {"Product Type": 3.0, "Keywords": 2.0, "Notes": 0.5},
         "output_cols": ["Product Type", "Keywords", "Primary (Hex)", "Secondary (Hex)", "CTA (Hex)", "Background (Hex)", "Text (Hex)", "Border (Hex)", "Notes"]
     },
     "chart": {
         "file": "charts.csv",
         "search_cols": ["Data Type", "Keywords", "Best Chart Type", "Accessibility Notes"],
+        "weights": {"Data Type": 3.0, "Keywords": 2.0, "Best Chart Type": 1.5, "Accessibility Notes": 0.5},
         "output_cols": ["Data Type", "Keywords", "Best Chart Type", "Secondary Options", "Color Guidance", "Accessibility Notes", "Library Recommendation", "Interactive Level"]
     },
     "landing": {
         "file": "landing.csv",
         "search_cols": ["Pattern Name", "Keywords", "Conversion Optimization", "Section Order"],
+        "weights": {"Pattern Name": 3.0, "Keywords": 2.0, "Section Order": 0.5},
         "output_cols": ["Pattern Name", "Keywords", "Section Order", "Primary CTA Placement", "Color Strategy", "Conversion Optimization"]
     },
     "product": {
         "file": "products.csv",
         "search_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Key Considerations"],
+        "weights": {"Product Type": 3.0, "Keywords": 2.0, "Key Considerations": 0.5},
         "output_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Secondary Styles", "Landing Page Pattern", "Dashboard Style (if applicable)", "Color Palette Focus"]
     },
     "ux": {
         "file": "ux-guidelines.csv",
         "search_cols": ["Category", "Issue", "Description", "Platform"],
+        "weights": {"Category": 1.5, "Issue": 3.0, "Platform": 0.5},
         "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
     },
     "typography": {
         "file": "typography.csv",
         "search_cols": ["Font Pairing Name", "Category", "Mood/Style Keywords", "Best For", "Heading Font", "Body Font"],
+        "weights": {"Font Pairing Name": 3.0, "Mood/Style Keywords": 2.0, "Heading Font": 1.5, "Body Font": 1.5},
         "output_cols": ["Font Pairing Name", "Category", "Heading Font", "Body Font", "Mood/Style Keywords", "Best For", "Google Fonts URL", "CSS Import", "Tailwind Config", "Notes"]
     },
     "icons": {
         "file": "icons.csv",
         "search_cols": ["Category", "Icon Name", "Keywords", "Best For"],
+        "weights": {"Icon Name": 3.0, "Keywords": 2.0},
         "output_cols": ["Category", "Icon Name", "Keywords", "Library", "Import Code", "Usage", "Best For", "Style"]
     },
     "react": {
         "file": "react-performance.csv",
         "search_cols": ["Category", "Issue", "Keywords", "Description"],
+        "weights": {"Category": 1.5, "Issue": 3.0, "Keywords": 2.0},
         "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
     },
     "web": {
         "file": "web-interface.csv",
         "search_cols": ["Category", "Issue", "Keywords", "Description"],
+        "weights": {"Category": 1.5, "Issue": 3.0, "Keywords": 2.0},
         "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
     }
 }
@@ -90,105 +127,1324 @@ STACK_CONFIG = {
 # Common columns for all stacks
 _STACK_COLS = {
     "search_cols": ["Category", "Guideline", "Description", "Do", "Don't"],
+    "weights": {"Category": 1.5, "Guideline": 3.0, "Do": 0.5, "Don't": 0.5},
     "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"]
 }
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
+CORPORA_ENV = "UI_PRO_MAX_CORPORA"  # os.pathsep-separated directories of extra corpora, see discover_corpora
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+# ============ TOKENIZER ============
+# Common English words that carry no signal in guideline text
+STOPWORDS = frozenset("""
+    about after all also and any are because been before being both but can could did does each
+    for from had has have how into its just more most not now only other our out over same should
+    some such than that the their them then there these they this those through too under use used
+    using very was were what when where which while who will with without would you your
+""".split())
+
+# Meaningful tokens shorter than the minimum length
+SHORT_TOKENS = frozenset(["ui", "ux", "ai", "3d", "2d", "ar", "vr", "xr", "os", "js", "ts", "qr", "db", "ci", "cd"])
+
+TOKEN_CACHE_SIZE = 50000
+
+
+class Tokenizer:
+    """Word tokenizer shared by indexing and querying
+
+    Lowercases, splits on non-word characters, drops stopwords and tokens
+    shorter than min_length unless allow-listed, and optionally applies a
+    light plural stemmer. Calling the tokenizer caches results per distinct
+    input string (queries, repeated cell values); tokenize() does not.
+    """
+
+    _WORD = re.compile(r'\w+')
+
+    def __init__(self, stopwords=STOPWORDS, short_tokens=SHORT_TOKENS, min_length=3, stem=False,
+                 cache_size=TOKEN_CACHE_SIZE):
+        self.stopwords = frozenset(stopwords)
+        self.short_tokens = frozenset(short_tokens)
+        self.min_length = min_length
+        self.stem = stem
+        self.cache_size = cache_size
+        self._cache = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
+    def __call__(self, text):
+        text = str(text)
+        tokens = self._cache.get(text)
+        if tokens is None:
+            tokens = self.tokenize(text)
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[text] = tokens
+        return tokens
+
+    def tokenize(self, text):
+        """Tokenize without touching the cache"""
+        return tuple(self._tokens(str(text)))
+
+    def _tokens(self, text):
+        stopwords, short_tokens, min_length = self.stopwords, self.short_tokens, self.min_length
+        for word in self._WORD.findall(text.lower()):
+            if word in stopwords or (len(word) < min_length and word not in short_tokens):
+                continue
+            yield self._stem(word) if self.stem else word
+
+    @staticmethod
+    def _stem(word):
+        """Light plural stemmer: folds regular English plurals onto the singular"""
+        if len(word) > 4 and word.endswith("ies") and not word.endswith(("eies", "aies")):
+            return word[:-3] + "y"
+        if len(word) > 4 and word.endswith(("sses", "xes", "zes", "ches", "shes")):
+            return word[:-2]
+        if len(word) > 3 and word.endswith("s") and not word.endswith(("us", "ss", "is")):
+            return word[:-1]
+        return word
+
+
+DEFAULT_TOKENIZER = Tokenizer()
+
 
 # ============ BM25 IMPLEMENTATION ============
+_numpy_module = None
+
+
+def _trigrams(term):
+    """Distinct character trigrams of a term padded with ^ and $ boundary marks"""
+    padded = f"^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    """Edit distance counting adjacent transpositions as one edit, or limit + 1 once it exceeds limit"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def _numpy():
+    """Import NumPy on first use; returns None when it is not installed"""
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+            _numpy_module = numpy
+        except ImportError:
+            _numpy_module = False
+    return _numpy_module or None
+
+
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search
+
+    engine: "python" scores from posting lists, "numpy" scores with a sparse
+    term-document matrix, "auto" picks NumPy for corpora of NUMPY_MIN_DOCS or
+    more when it is installed. Both engines return identical rankings.
+    """
 
-    def __init__(self, k1=1.5, b=0.75):
+    _tf_type = 'I'  # typecode of posting term frequencies
+
+    def __init__(self, k1=1.5, b=0.75, engine="auto", tokenizer=None):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.engine = engine
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
+        # Terms are interned once into integer ids; everything per-document
+        # or per-posting lives in typed arrays rather than Python objects
+        self.vocab = {}              # term -> term id
+        self.postings = []           # term id -> (array('I') doc ids, array('I') term freqs)
+        self.idf = array('d')        # term id -> idf
+        self.max_impacts = array('d')  # term id -> largest contribution of one occurrence to any document
+        self.max_idf = 0.0           # idf of the rarest term, the bound charged for query tokens with no term
+        self.doc_offsets = array('I', [0])
+        self.doc_terms = array('I')  # distinct term ids of doc i at doc_offsets[i]:doc_offsets[i+1]
+        self.doc_lengths = array('I')
+        self.doc_norms = array('d')
         self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
         self.N = 0
+        self._matrix = None
+        # Character trigram -> term ids, for expanding misspelled or partial query tokens
+        self.terms = []              # term id -> term
+        self.term_grams = {}
+
+    def __getstate__(self):
+        # The CSR matrix is derived data; rebuild it lazily so loading a
+        # persisted index never requires NumPy
+        state = self.__dict__.copy()
+        state["_matrix"] = None
+        if self.tokenizer is DEFAULT_TOKENIZER:
+            state["tokenizer"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.tokenizer = self.tokenizer or DEFAULT_TOKENIZER
 
     def tokenize(self, text):
-        """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        """Tokenize with the same Tokenizer used to build the index"""
+        return self.tokenizer(text)
 
     def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        """Build BM25 index from documents (strings or pre-tokenized sequences)"""
+        self.vocab = {}
+        self.postings = []
+        self.doc_offsets = array('I', [0])
+        self.doc_terms = array('I')
+        self.doc_lengths = array('I')
+        for idx, doc in enumerate(documents):
+            tokens = self.tokenizer.tokenize(doc) if isinstance(doc, str) else doc
+            freqs = self._term_freqs(tokens)
+            self.doc_lengths.append(len(tokens))
+            self.doc_terms.extend(freqs)
+            self.doc_offsets.append(len(self.doc_terms))
+            for term_id, tf in freqs.items():
+                doc_ids, tfs = self.postings[term_id]
+                doc_ids.append(idx)
+                tfs.append(tf)
+        self._update_statistics()
+
+    def update(self, kept, added):
+        """Apply an edit of the corpus without re-tokenizing unchanged documents
+
+        kept: (old_id, new_id) pairs for surviving documents, in order.
+        added: (new_id, tokens) pairs for inserted or changed documents.
+        Together they must cover new ids 0..n-1. Postings are renumbered and
+        merged so the result scores exactly like a fresh fit() of the new corpus.
+        """
+        n_docs = len(kept) + len(added)
+        old_to_new = array('l', [-1]) * self.N
+        for old_id, new_id in kept:
+            old_to_new[old_id] = new_id
+
+        # Renumber surviving postings; the mapping is monotonic so they stay
+        # sorted, and the prefix before the first edited document is untouched
+        first_moved = next((old_id for old_id in range(self.N) if old_to_new[old_id] != old_id), self.N)
+        for term_id, (doc_ids, tfs) in enumerate(self.postings):
+            start = bisect_left(doc_ids, first_moved)
+            if start == len(doc_ids):
+                continue
+            moved = list(map(old_to_new.__getitem__, doc_ids[start:]))
+            if -1 in moved:
+                pairs = [(d, tf) for d, tf in zip(moved, tfs[start:]) if d >= 0]
+                moved = [d for d, _ in pairs]
+                tfs = tfs[:start] + array('I', (tf for _, tf in pairs))
+            self.postings[term_id] = (doc_ids[:start] + array('I', moved), tfs)
+
+        doc_lengths = array('I', [0]) * n_docs
+        doc_terms = [None] * n_docs
+        for old_id, new_id in kept:
+            doc_lengths[new_id] = self.doc_lengths[old_id]
+            doc_terms[new_id] = self.doc_terms[self.doc_offsets[old_id]:self.doc_offsets[old_id + 1]]
+
+        additions = {}
+        for new_id, tokens in added:
+            freqs = self._term_freqs(tokens)
+            doc_lengths[new_id] = len(tokens)
+            doc_terms[new_id] = array('I', freqs)
+            for term_id, tf in freqs.items():
+                additions.setdefault(term_id, []).append((new_id, tf))
+        for term_id, entries in additions.items():
+            doc_ids, tfs = self.postings[term_id]
+            merged = sorted(list(zip(doc_ids, tfs)) + entries)
+            self.postings[term_id] = (array('I', (d for d, _ in merged)), array('I', (tf for _, tf in merged)))
+
+        # Renumber terms by first occurrence, exactly as fit() numbers them:
+        # terms that no longer occur drop out and ids stay dense
+        term_map = array('l', [-1]) * len(self.postings)
+        old_terms = {term_id: term for term, term_id in self.vocab.items()}
+        postings, vocab = [], {}
+        for terms in doc_terms:
+            for term_id in terms:
+                if term_map[term_id] < 0:
+                    term_map[term_id] = vocab[old_terms[term_id]] = len(postings)
+                    postings.append(self.postings[term_id])
+        self.postings, self.vocab = postings, vocab
+
+        self.doc_lengths = doc_lengths
+        self.doc_terms = array('I')
+        self.doc_offsets = array('I', [0])
+        for terms in doc_terms:
+            self.doc_terms.extend(map(term_map.__getitem__, terms))
+            self.doc_offsets.append(len(self.doc_terms))
+        self._update_statistics()
+
+    def _term_freqs(self, tokens):
+        """Term id -> frequency for one document, adding unseen terms to the vocabulary"""
+        vocab = self.vocab
+        freqs = {}
+        for word in tokens:
+            term_id = vocab.get(word)
+            if term_id is None:
+                term_id = vocab[word] = len(self.postings)
+                self.postings.append((array('I'), array(self._tf_type)))
+            freqs[term_id] = freqs.get(term_id, 0) + 1
+        return freqs
+
+    def _update_statistics(self):
+        """Recompute corpus-level statistics: N, avgdl, length norms, IDF and the trigram index"""
+        self._matrix = None
+        self._build_grams()
+        self.N = len(self.doc_lengths)
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+        self.doc_norms = self._length_norms()
+        self.idf = array('d', (log((self.N - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5) + 1) for doc_ids, _ in self.postings))
+        self.max_idf = max((idf for idf, (doc_ids, _) in zip(self.idf, self.postings) if doc_ids), default=0.0)
+
+        # Per-term upper bounds for MaxScore, evaluated exactly as scoring does
+        scale = self.k1 + 1
+        norms = self.doc_norms
+        self.max_impacts = array('d', (max((idf * (tf * scale) / (tf + norms[idx]) for idx, tf in zip(doc_ids, tfs)), default=0.0)
+                                       for idf, (doc_ids, tfs) in zip(self.idf, self.postings)))
+
+    def _build_grams(self):
+        self.terms = [None] * len(self.postings)
+        term_grams = {}
+        for term, term_id in self.vocab.items():
+            self.terms[term_id] = term
+            for gram in _trigrams(term):
+                if gram not in term_grams:
+                    term_grams[gram] = array('I')
+                term_grams[gram].append(term_id)
+        self.term_grams = term_grams
+
+    def expand(self, query_tokens):
+        """Replace query tokens missing from the vocabulary by their closest terms
+
+        Typos are corrected within a small edit budget ("glasmorphism") and
+        partial words complete to terms they are a prefix of ("neumorph");
+        see closest_terms.
+        """
+        return self.expand_counting(query_tokens)[0]
+
+    def expand_counting(self, query_tokens):
+        """expand() plus the number of query tokens with neither a term nor a close one"""
+        vocab = self.vocab
+        if all(token in vocab for token in query_tokens):
+            return list(query_tokens), 0
+        expanded, unmatched = [], 0
+        for token in query_tokens:
+            if token in vocab:
+                expanded.append(token)
+                continue
+            closest = self.closest_terms(token) if len(token) >= FUZZY_MIN_LENGTH else []
+            if not closest:
+                unmatched += 1
+            expanded.extend(term for term in closest if term not in query_tokens and term not in expanded)
+        return expanded, unmatched
+
+    def closest_terms(self, token, limit=FUZZY_MAX_EXPANSIONS):
+        """Vocabulary terms closest to a token, fewest edits first
+
+        A term matches within the FUZZY_EDITS budget for the token's length,
+        or when the token is a prefix covering at least FUZZY_PREFIX_COVERAGE
+        of it (ranked as 1 edit). Candidates come from the trigram index, and
+        since one edit destroys at most 3 trigrams, only terms sharing enough
+        of them are compared character by character.
+        """
+        grams = _trigrams(token)
+        shared = {}
+        for gram in grams:
+            for term_id in self.term_grams.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+
+        max_edits = max([edits for length, edits in FUZZY_EDITS if len(token) >= length], default=0)
+        min_shared = len(grams) - 3 * max_edits
+        matches = []
+        for term_id, count in shared.items():
+            term = self.terms[term_id]
+            if term.startswith(token) and len(token) >= FUZZY_PREFIX_COVERAGE * len(term):
+                matches.append((1, -count, term_id))
+            elif max_edits and count >= min_shared and abs(len(term) - len(token)) <= max_edits:
+                edits = _edit_distance(token, term, max_edits)
+                if edits <= max_edits:
+                    matches.append((edits, -count, term_id))
+        # Ties go to the term seen first in the corpus, keeping results deterministic
+        import heapq
+        return [self.terms[term_id] for _, _, term_id in heapq.nsmallest(limit, matches)]
+
+    def _length_norms(self):
+        # Length normalization is query independent, so fold it in once
+        return array('d', (self.k1 * (1 - self.b + self.b * doc_len / self.avgdl) for doc_len in self.doc_lengths))
+
+    def _use_numpy(self):
+        if self.engine == "python":
+            return False
+        if self.engine == "numpy":
+            if _numpy() is None:
+                raise ImportError("BM25 engine 'numpy' requires NumPy to be installed")
+            return True
+        return self.N >= NUMPY_MIN_DOCS and _numpy() is not None
+
+    def score(self, query, k=None):
+        """Score documents containing a query token, best first (top k if given)"""
+        return self.score_tokens(self.tokenize(query), k)
+
+    def score_tokens(self, query_tokens, k=None):
+        """Like score() for a query that is already tokenized"""
+        if self._use_numpy():
+            return self._score_numpy(query_tokens, k)
+        if k is not None and TOPK_PRUNING and self.N >= PRUNE_MIN_DOCS:
+            return self._score_maxscore(query_tokens, k)
+        return self._score_python(query_tokens, k)
+
+    def max_score(self, query_tokens, unmatched=0):
+        """Upper bound of a document's score for the whole query: each term tends to idf * (k1 + 1)
+
+        unmatched counts query tokens the index has no term for; each is charged
+        the rarest term's idf, so an index matching less of the query is not
+        rated against an easier bound.
+        """
+        vocab = self.vocab
+        idf = sum(self.idf[vocab[token]] for token in query_tokens if token in vocab)
+        return (idf + unmatched * self.max_idf) * (self.k1 + 1)
+
+    def _score_python(self, query_tokens, k):
+        scores = {}
+        numerator_scale = self.k1 + 1
+        for token in query_tokens:
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                continue
+            idf = self.idf[term_id]
+            doc_ids, tfs = self.postings[term_id]
+            for idx, tf in zip(doc_ids, tfs):
+                numerator = tf * numerator_scale
+                denominator = tf + self.doc_norms[idx]
+                scores[idx] = scores.get(idx, 0) + idf * numerator / denominator
+
+        # Ties keep corpus order, matching a stable descending sort
+        if k is None:
+            return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        import heapq
+        return heapq.nlargest(k, scores.items(), key=lambda x: (x[1], -x[0]))
+
+    def _score_maxscore(self, query_tokens, k):
+        """Top-k with MaxScore dynamic pruning; returns exactly what _score_python returns
+
+        Terms are visited by decreasing upper bound (max_impacts). Once the
+        bounds of the terms still to come add up to less than the current k-th
+        best partial score, no unseen document can make the top k: later
+        terms only update the surviving candidates (by binary search when
+        that is cheaper than walking the posting list), and candidates that
+        can no longer catch up are dropped. Survivors are then rescored in
+        query-token order so sums round exactly like the exhaustive path.
+        """
+        vocab = self.vocab
+        counts = {}
+        for token in query_tokens:
+            term_id = vocab.get(token)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        if len(counts) < 2:
+            return self._score_python(query_tokens, k)
+
+        import heapq
+        idf, norms, scale = self.idf, self.doc_norms, self.k1 + 1
+        bounds = {term_id: self.max_impacts[term_id] * count for term_id, count in counts.items()}
+        remaining = sum(bounds.values())
+        partial = {}
+        pruning = False
+        for term_id in sorted(counts, key=lambda t: (-bounds[t], t)):
+            remaining -= bounds[term_id]
+            weight, count = idf[term_id], counts[term_id]
+            doc_ids, tfs = self.postings[term_id]
+            if not pruning:
+                for idx, tf in zip(doc_ids, tfs):
+                    partial[idx] = partial.get(idx, 0) + count * (weight * (tf * scale) / (tf + norms[idx]))
+            else:
+                for idx, tf in self._candidate_postings(partial, doc_ids, tfs):
+                    partial[idx] += count * (weight * (tf * scale) / (tf + norms[idx]))
+            if len(partial) >= k:
+                threshold = heapq.nlargest(k, partial.values())[-1] * (1 - PRUNE_SLACK)
+                if remaining < threshold:
+                    pruning = True
+                    partial = {idx: score for idx, score in partial.items() if score + remaining >= threshold}
+        if not pruning:
+            return self._score_python(query_tokens, k)
+
+        scores = dict.fromkeys(partial, 0)
+        for token in query_tokens:
+            term_id = vocab.get(token)
+            if term_id is None:
+                continue
+            weight = idf[term_id]
+            doc_ids, tfs = self.postings[term_id]
+            for idx, tf in self._candidate_postings(scores, doc_ids, tfs):
+                scores[idx] = scores[idx] + weight * (tf * scale) / (tf + norms[idx])
+        return heapq.nlargest(k, scores.items(), key=lambda x: (x[1], -x[0]))
+
+    @staticmethod
+    def _candidate_postings(candidates, doc_ids, tfs):
+        """(doc id, tf) pairs of a posting list restricted to candidate documents"""
+        if len(candidates) * len(doc_ids).bit_length() >= len(doc_ids):
+            return [(idx, tf) for idx, tf in zip(doc_ids, tfs) if idx in candidates]
+        matches = []
+        for idx in candidates:
+            pos = bisect_left(doc_ids, idx)
+            if pos < len(doc_ids) and doc_ids[pos] == idx:
+                matches.append((idx, tfs[pos]))
+        return matches
+
+    def _build_matrix(self):
+        """Term-major CSR matrix holding each (term, doc) BM25 contribution"""
+        np = _numpy()
+        lengths = [len(doc_ids) for doc_ids, _ in self.postings]
+        indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        if not lengths:
+            self._matrix = (indptr, np.zeros(0, dtype=np.int64), np.zeros(0))
+            return self._matrix
+
+        # Posting arrays are typed, so NumPy can view them without copying per element
+        indices = np.concatenate([np.frombuffer(doc_ids, dtype=np.uint32) for doc_ids, _ in self.postings]).astype(np.int64)
+        tf_dtype = np.float64 if self._tf_type == 'd' else np.uint32
+        tfs = np.concatenate([np.frombuffer(tfs, dtype=tf_dtype) for _, tfs in self.postings]).astype(np.float64)
+        idf = np.repeat(np.frombuffer(self.idf, dtype=np.float64), lengths)
+        norms = np.frombuffer(self.doc_norms, dtype=np.float64)
+
+        # Same operation order as the pure-Python path, so scores are bit-identical
+        data = idf * (tfs * (self.k1 + 1)) / (tfs + norms[indices])
+        self._matrix = (indptr, indices, data)
+        return self._matrix
+
+    def _score_numpy(self, query_tokens, k):
+        np = _numpy()
+        indptr, indices, data = self._matrix or self._build_matrix()
+        vocab = self.vocab
+        spans = [(indptr[vocab[t]], indptr[vocab[t] + 1]) for t in query_tokens if t in vocab]
+        if not spans:
+            return []
+
+        # One weighted bincount sums every query term's column slice at once
+        doc_ids = np.concatenate([indices[start:end] for start, end in spans])
+        weights = np.concatenate([data[start:end] for start, end in spans])
+        scores = np.bincount(doc_ids, weights=weights, minlength=self.N)
+
+        candidates = np.flatnonzero(scores > 0)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        if k is not None:
+            order = order[:k]
+        return [(int(idx), float(scores[idx])) for idx in order]
+
+
+class BM25F(BM25):
+    """BM25F: BM25 over documents split into weighted fields
+
+    fields is one (weight, b) pair per field. Each field's term frequency is
+    length-normalized against that field's own average length, weighted, and
+    the sum is saturated once with k1. The combined pseudo-frequency of every
+    (term, document) pair is computed by fit() from per-field statistics and
+    stored in the postings, so scoring a query costs the same as flat BM25.
+    """
+
+    _tf_type = 'd'
+
+    def __init__(self, fields, k1=1.5, b=0.75, engine="auto", tokenizer=None):
+        super().__init__(k1, b, engine, tokenizer)
+        self.fields = [(float(weight), float(field_b)) for weight, field_b in fields]
+        self.field_avglens = array('d')
+
+    def fit(self, documents):
+        """Build the index from documents given as one string or token sequence per field"""
+        documents = [[self.tokenizer.tokenize(value) if isinstance(value, str) else value for value in doc]
+                     for doc in documents]
+        n_docs = len(documents) or 1
+        self.field_avglens = array('d', (sum(len(doc[i]) for doc in documents) / n_docs
+                                          for i in range(len(self.fields))))
+
+        self.vocab = {}
+        self.postings = []
+        self.doc_offsets = array('I', [0])
+        self.doc_terms = array('I')
+        self.doc_lengths = array('I')
+        for idx, doc in enumerate(documents):
+            freqs = {}
+            for (weight, field_b), avglen, tokens in zip(self.fields, self.field_avglens, doc):
+                if not tokens or not weight:
+                    continue
+                norm = 1 - field_b + field_b * len(tokens) / avglen
+                for term_id, tf in self._term_freqs(tokens).items():
+                    freqs[term_id] = freqs.get(term_id, 0) + weight * tf / norm
+            self.doc_lengths.append(sum(map(len, doc)))
+            self.doc_terms.extend(freqs)
+            self.doc_offsets.append(len(self.doc_terms))
+            for term_id, tf in freqs.items():
+                doc_ids, tfs = self.postings[term_id]
+                doc_ids.append(idx)
+                tfs.append(tf)
+        self._update_statistics()
+
+    def update(self, kept, added):
+        """Not supported: call fit() with the whole corpus (update_index rebuilds BM25F indexes)
+
+        Field average lengths move with every edit, which changes the
+        pseudo-frequency of every posting, and the per-field tokens of kept
+        documents are not stored, so there is nothing to merge into.
+        """
+        raise TypeError("BM25F indexes cannot be updated incrementally; fit() the full corpus instead")
+
+    def _length_norms(self):
+        # Length normalization already happened per field, inside the pseudo-frequencies
+        return array('d', [self.k1]) * self.N
+
+
+# ============ PERSISTENT INDEX ============
+class CSVRows:
+    """Lazy view of a CSV's rows: byte offsets in memory, cells read on demand
+
+    Only the winning rows of a search are ever displayed, so instead of
+    holding every cell the index keeps where each row starts in the file and
+    reads just the rows asked for, from the memory-mapped row store when it
+    is current and by parsing the CSV at those offsets otherwise. Like
+    csv.DictReader, cells missing from a short row read as None. The file's
+    mtime and size at indexing time tell when the offsets no longer describe
+    it (see is_stale).
+    """
+
+    __slots__ = ("filepath", "fields", "offsets", "mtime_ns", "size")
+
+    def __init__(self, filepath, fields, offsets, stat):
+        self.filepath = str(filepath)
+        self.fields = list(fields)
+        self.offsets = offsets  # array('Q'): start of each row, then end of file
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        return dict(zip(self.fields, self.fetch([idx])[0]))
+
+    def is_stale(self):
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return True
+        return stat.st_mtime_ns != self.mtime_ns or stat.st_size != self.size
+
+    def fetch(self, ids):
+        """Raw cell lists of the given rows, padded to the header width, in one file pass"""
+        width = len(self.fields)
+        store = open_row_store(self.filepath)
+        if store is not None and (store.mtime_ns, store.size) == (self.mtime_ns, self.size):
+            return [row + [None] * (width - len(row)) for row in map(store.get, ids)]
+
+        import csv
+        import io
+        rows = []
+        with open(self.filepath, 'rb') as f:
+            for idx in ids:
+                f.seek(self.offsets[idx])
+                chunk = f.read(self.offsets[idx + 1] - self.offsets[idx]).decode('utf-8')
+                row = next(row for row in csv.reader(io.StringIO(chunk, newline='')) if row)
+                rows.append(row + [None] * (width - len(row)))
+        return rows
+
+    def project(self, ids, output_cols):
+        """Output columns of each given row (columns missing from the CSV are skipped)"""
+        positions = {field: i for i, field in enumerate(self.fields)}
+        cols = [(col, positions[col]) for col in output_cols if col in positions]
+        return [{col: row[i] for col, i in cols} for row in self.fetch(ids)]
+
+
+class CSVIndex:
+    """Prebuilt BM25 index over the search columns of one CSV file
+
+    row_hashes fingerprints every CSV row so an edited file can be diffed
+    against the index and updated incrementally (see update_index).
+    """
+
+    __slots__ = ("rows", "bm25", "row_hashes")
+
+    def __init__(self, rows, bm25, row_hashes):
+        self.rows = rows
+        self.bm25 = bm25
+        self.row_hashes = row_hashes
+
+
+def _file_hash(filepath):
+    """SHA-1 of file contents, used when mtime alone cannot prove freshness"""
+    import hashlib
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _index_path(filepath, search_cols, weights=None):
+    """Location of the compiled index for a CSV, its search columns and BM25F weights"""
+    key = "\0".join([str(Path(filepath).resolve())] + list(search_cols))
+    if weights:
+        key += "\0" + repr(tuple(weights))
+    digest = f"{zlib.crc32(key.encode('utf-8')):08x}"
+    return INDEX_DIR / f"{Path(filepath).stem}-{digest}.idx"
+
+
+def _write_index(index_path, header, index):
+    """Atomically write header + index; silently skip on read-only installs"""
+    try:
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        ignore_file = INDEX_DIR / ".gitignore"
+        if not ignore_file.exists():
+            ignore_file.write_text("*\n", encoding='utf-8')
+        tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass
+
+
+class _ByteCountingLines:
+    """Decoded lines of a binary file, counting the bytes handed out so far"""
+
+    def __init__(self, f):
+        self.f = f
+        self.offset = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode('utf-8')
+
+
+def _read_csv(filepath):
+    """Parse a CSV into (field names, non-blank rows as lists, row offsets)
+
+    offsets holds the byte position where each row starts, followed by the
+    file size. csv.reader never reads past the record it returns, so the
+    bytes consumed before each record mark its start even when quoted cells
+    span lines.
+    """
+    import csv
+    with open(filepath, 'rb') as f:
+        lines = _ByteCountingLines(f)
+        reader = csv.reader(lines)
+        fields = next(reader, [])
+        rows, offsets = [], array('Q')
+        start = lines.offset
+        for row in reader:
+            if row:
+                rows.append(row)
+                offsets.append(start)
+            start = lines.offset
+        offsets.append(lines.offset)
+        return fields, rows, offsets
+
+
+def _row_hash(row):
+    """64-bit fingerprint of a row's values, stable across processes"""
+    import hashlib
+    values = "\x1f".join(row).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(values, digest_size=8).digest(), 'little')
+
+
+def _row_documents(rows, fields, search_cols, tokenizer, fielded=False):
+    """Token lists built from each row's search columns; repeated cell values tokenize once
+
+    fielded=True keeps one token list per search column (for BM25F) instead
+    of concatenating them.
+    """
+    positions = {field: i for i, field in enumerate(fields)}
+    cell_tokens = {}
+    documents = []
+    for row in rows:
+        cells = []
+        for col in search_cols:
+            i = positions.get(col)
+            # Same text csv.DictReader rows produced: "" for absent columns, "None" for short rows
+            value = "" if i is None else (row[i] if i < len(row) else "None")
+            if value not in cell_tokens:
+                cell_tokens[value] = tokenizer.tokenize(value)
+            cells.append(cell_tokens[value])
+        documents.append(cells if fielded else [token for tokens in cells for token in tokens])
+    return documents
+
+
+def _save_index(filepath, search_cols, index, stat=None, weights=None):
+    """Persist an index with a header describing the CSV it was built from"""
+    stat = stat or filepath.stat()
+    header = {
+        "version": INDEX_VERSION,
+        "search_cols": list(search_cols),
+        "weights": list(weights or []),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": _file_hash(filepath)
+    }
+    _write_index(_index_path(filepath, search_cols, weights), header, index)
+
+
+def build_index(filepath, search_cols, weights=None):
+    """Parse a CSV, fit BM25 over its search columns and persist the result
+
+    weights: (weight, b) per search column selects BM25F scoring (see
+    field_weights); None indexes the columns as one flat BM25 document.
+    """
+    filepath = Path(filepath)
+    stat = filepath.stat()
+    fields, data, offsets = _read_csv(filepath)
+
+    bm25 = BM25F(weights) if weights else BM25()
+    bm25.fit(_row_documents(data, fields, search_cols, bm25.tokenizer, fielded=bool(weights)))
+    index = CSVIndex(CSVRows(filepath.resolve(), fields, offsets, stat), bm25, array('Q', map(_row_hash, data)))
+
+    _save_index(filepath, search_cols, index, stat, weights)
+    _write_row_store(filepath, fields, data, stat)
+    return index
+
+
+def update_index(filepath, search_cols, index, weights=None):
+    """Bring an index up to date with its edited CSV, touching only changed rows
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+    Rows are matched by content hash: unchanged rows keep their tokens and
+    postings (renumbered if rows moved), only added or edited rows are
+    tokenized, then document frequencies, IDF and average length are
+    recomputed. Falls back to a full build when the header changed, nothing
+    survived the edit, or the index is BM25F (whose field averages touch
+    every posting).
+    """
+    filepath = Path(filepath)
+    stat = filepath.stat()
+    fields, data, offsets = _read_csv(filepath)
+    if fields != index.rows.fields or isinstance(index.bm25, BM25F):
+        return build_index(filepath, search_cols, weights)
 
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+    from difflib import SequenceMatcher  # only needed when a CSV was edited
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+    row_hashes = array('Q', map(_row_hash, data))
+    matcher = SequenceMatcher(None, index.row_hashes.tolist(), row_hashes.tolist(), autojunk=False)
+    kept, changed = [], []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            kept.extend(zip(range(i1, i2), range(j1, j2)))
+        else:
+            changed.extend(range(j1, j2))
+    if not kept:
+        return build_index(filepath, search_cols, weights)
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+    if changed or len(kept) != len(index.row_hashes):
+        documents = _row_documents([data[j] for j in changed], fields, search_cols, index.bm25.tokenizer)
+        index.bm25.update(kept, list(zip(changed, documents)))
+    index.rows = CSVRows(filepath.resolve(), fields, offsets, stat)
+    index.row_hashes = row_hashes
 
-            scores.append((idx, score))
+    _save_index(filepath, search_cols, index, stat, weights)
+    _write_row_store(filepath, fields, data, stat)
+    return index
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+
+def load_index(filepath, search_cols, weights=None):
+    """Load the compiled index for a CSV, updating it if the CSV changed"""
+    filepath = Path(filepath)
+    index_path = _index_path(filepath, search_cols, weights)
+    try:
+        stat = filepath.stat()
+        with open(index_path, 'rb') as f:
+            header = pickle.load(f)
+            if (header.get("version") != INDEX_VERSION or header.get("search_cols") != list(search_cols)
+                    or header.get("weights") != list(weights or [])):
+                return build_index(filepath, search_cols, weights)
+            if header["mtime_ns"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+                return pickle.load(f)
+            index = pickle.load(f)
+        # mtime moved (checkout, touch): only update if the content really changed
+        if header["size"] != stat.st_size or header["sha1"] != _file_hash(filepath):
+            return update_index(filepath, search_cols, index, weights)
+    except (OSError, EOFError, KeyError, pickle.UnpicklingError, AttributeError):
+        return build_index(filepath, search_cols, weights)
+
+    _restamp_row_store(filepath, header["mtime_ns"], stat)
+    header["mtime_ns"] = index.rows.mtime_ns = stat.st_mtime_ns
+    _write_index(index_path, header, index)
+    return index
+
+
+def build_indexes(scoring=None):
+    """Compile indexes for every configured domain and stack plus a row store
+    for every CSV under DATA_DIR; returns the paths written"""
+    targets = [(DATA_DIR / cfg["file"], cfg) for cfg in CSV_CONFIG.values()]
+    targets += [(DATA_DIR / cfg["file"], _stack_config(stack)) for stack, cfg in STACK_CONFIG.items()]
+    built = []
+    for filepath, config in targets:
+        if filepath.exists():
+            weights = field_weights(config, scoring)
+            build_index(filepath, config["search_cols"], weights)
+            built.append(str(_index_path(filepath, config["search_cols"], weights)))
+    indexed = {filepath for filepath, _ in targets}
+    for filepath in sorted(DATA_DIR.rglob("*.csv")):
+        # Indexed CSVs got their row store from build_index
+        built.append(str(_row_store_path(filepath) if filepath in indexed else build_row_store(filepath)))
+    return built
+
+
+def field_weights(config, scoring=None):
+    """BM25F (weight, b) per search column of a CSV config, or None for flat BM25
+
+    Weights come from the config's "weights" mapping (DEFAULT_FIELD_WEIGHT
+    for columns it omits); every column uses the default BM25 b unless the
+    config has a "field_b" mapping. scoring defaults to SCORING.
+    """
+    scoring = scoring or SCORING
+    if scoring not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode: {scoring}. Available: {', '.join(SCORING_MODES)}")
+    if scoring != "bm25f":
+        return None
+    weights = config.get("weights", {})
+    field_b = config.get("field_b", {})
+    return tuple((float(weights.get(col, DEFAULT_FIELD_WEIGHT)), float(field_b.get(col, 0.75)))
+                 for col in config["search_cols"])
+
+
+# ============ ROW STORE ============
+# Binary sidecar of a CSV's parsed rows, memory-mapped so a process reads
+# rows without parsing CSV text. Layout (native byte order, it is a local
+# cache): header, offsets table (n_rows + 1 byte offsets into the blob; row 0
+# is the CSV header), then the blob of rows, each one UTF-8 record with its
+# cells separated by NUL. CSVs containing NUL get no row store.
+ROW_STORE_MAGIC = b"UIPXROW2"
+_ROW_STORE_HEADER = "=8sqqQ"  # struct format: magic, CSV mtime_ns, CSV size, n_rows
+_ROW_STORE_HEADER_SIZE = 32
+_CELL_SEP = "\x00"
+
+
+class RowStore:
+    """Read-only view of a row store buffer; the offsets table is used in place, never copied"""
+
+    __slots__ = ("mtime_ns", "size", "fields", "_offsets", "_blob")
+
+    def __init__(self, buffer):
+        import struct
+        magic, self.mtime_ns, self.size, n_rows = struct.unpack_from(_ROW_STORE_HEADER, buffer)
+        if magic != ROW_STORE_MAGIC:
+            raise ValueError("Not a row store")
+        view = memoryview(buffer)
+        start = _ROW_STORE_HEADER_SIZE
+        end = start + 8 * (n_rows + 1)
+        self._offsets = view[start:end].cast('Q')
+        self._blob = view[end:]
+        self.fields = self._row(0)
+
+    def __len__(self):
+        return len(self._offsets) - 2
+
+    def _row(self, i):
+        # One decode and one C-level split per row, whatever its width
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], 'utf-8').split(_CELL_SEP)
+
+    def get(self, idx):
+        """Cells of data row idx as written (short rows stay short)"""
+        return self._row(idx + 1)
+
+
+_ROW_STORES = {}
+
+
+def _row_store_path(filepath):
+    """Location of the row store for a CSV"""
+    digest = f"{zlib.crc32(str(Path(filepath).resolve()).encode('utf-8')):08x}"
+    return INDEX_DIR / f"{Path(filepath).stem}-{digest}.rows"
+
+
+def _encode_row_store(fields, rows, stat):
+    """Row store bytes for parsed rows, or None when a cell contains the separator"""
+    offsets = array('Q', [0])
+    records = []
+    for row in [fields] + rows:
+        record = _CELL_SEP.join(row)
+        if record.count(_CELL_SEP) != len(row) - 1:
+            return None
+        records.append(record.encode('utf-8'))
+        offsets.append(offsets[-1] + len(records[-1]))
+    import struct
+    header = struct.pack(_ROW_STORE_HEADER, ROW_STORE_MAGIC, stat.st_mtime_ns, stat.st_size, len(offsets) - 1)
+    return b"".join([header, offsets.tobytes()] + records)
+
+
+def _write_row_store(filepath, fields, rows, stat):
+    """Atomically write the row store of already-parsed rows; skipped on read-only installs"""
+    store_path = _row_store_path(filepath)
+    _ROW_STORES.pop(str(Path(filepath).resolve()), None)
+    data = _encode_row_store(fields, rows, stat)
+    if data is None:
+        return store_path
+    try:
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = store_path.with_name(f"{store_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, store_path)
+    except OSError:
+        pass
+    return store_path
+
+
+def _restamp_row_store(filepath, old_mtime_ns, stat):
+    """Point a row store at a CSV whose mtime moved but whose content did not"""
+    import struct
+    try:
+        with open(_row_store_path(filepath), 'r+b') as f:
+            magic, mtime_ns, size, n_rows = struct.unpack(_ROW_STORE_HEADER, f.read(_ROW_STORE_HEADER_SIZE))
+            if magic == ROW_STORE_MAGIC and (mtime_ns, size) == (old_mtime_ns, stat.st_size):
+                f.seek(0)
+                f.write(struct.pack(_ROW_STORE_HEADER, magic, stat.st_mtime_ns, size, n_rows))
+    except (OSError, struct.error):
+        pass
+    _ROW_STORES.pop(str(Path(filepath).resolve()), None)
+
+
+def build_row_store(filepath):
+    """Parse a CSV once and write its row store, returns the store path"""
+    filepath = Path(filepath)
+    stat = filepath.stat()
+    fields, rows, _ = _read_csv(filepath)
+    return _write_row_store(filepath, fields, rows, stat)
+
+
+def open_row_store(filepath):
+    """Memory-mapped row store of a CSV, or None when it is missing or older than the CSV"""
+    source = os.fspath(filepath)  # callers on the hot path pass resolved paths already
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return None
+    store = _ROW_STORES.get(source)
+    if store is not None and (store.mtime_ns, store.size) == (stat.st_mtime_ns, stat.st_size):
+        return store
+    import mmap
+    import struct
+    try:
+        with open(_row_store_path(source), 'rb') as f:
+            store = RowStore(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError, struct.error):
+        return None
+    if (store.mtime_ns, store.size) != (stat.st_mtime_ns, stat.st_size):
+        return None
+    _ROW_STORES[source] = store
+    return store
+
+
+def _row_dict(fields, row):
+    """A csv.DictReader row: missing cells are None, extra cells go under the None key"""
+    record = dict(zip(fields, row))
+    if len(row) > len(fields):
+        record[None] = row[len(fields):]
+    else:
+        for field in fields[len(row):]:
+            record[field] = None
+    return record
+
+
+def load_rows(filepath):
+    """Every row of a CSV as a dict, like csv.DictReader, read from its row store
+
+    A missing or stale store is rebuilt from the CSV on the way.
+    """
+    store = open_row_store(filepath)
+    if store is None:
+        filepath = Path(filepath)
+        stat = filepath.stat()
+        fields, rows, _ = _read_csv(filepath)
+        _write_row_store(filepath, fields, rows, stat)
+        return [_row_dict(fields, row) for row in rows]
+    fields = store.fields
+    return [_row_dict(fields, store.get(idx)) for idx in range(len(store))]
+
+
+# ============ INDEX REGISTRY ============
+_INDEX_REGISTRY = {}
+_REGISTRY_LOCK = allocate_lock()
+_LOAD_LOCKS = {}  # registry key -> lock held while that index loads
+
+
+def _registry_key(filepath, search_cols, weights=None):
+    return (str(Path(filepath).resolve()), tuple(search_cols), weights)
+
+
+def get_index(filepath, search_cols, weights=None):
+    """Return the process-wide index for a CSV, loading it on first use or after the CSV changed"""
+    key = _registry_key(filepath, search_cols, weights)
+    index = _INDEX_REGISTRY.get(key)
+    if index is None or index.rows.is_stale():
+        # Threads wanting the same index wait for one load; different indexes load in parallel
+        with _REGISTRY_LOCK:
+            load_lock = _LOAD_LOCKS.setdefault(key, allocate_lock())
+        with load_lock:
+            index = _INDEX_REGISTRY.get(key)
+            if index is None or index.rows.is_stale():
+                index = load_index(filepath, search_cols, weights)
+                _INDEX_REGISTRY[key] = index
+    return index
+
+
+def invalidate_indexes(filepath=None):
+    """Forget in-process indexes and row stores (all of them, or only those built from filepath)"""
+    if filepath is None:
+        _INDEX_REGISTRY.clear()
+        _ROW_STORES.clear()
+        return
+    source = str(Path(filepath).resolve())
+    _ROW_STORES.pop(source, None)
+    # list() snapshots the keys: daemon threads may add or drop indexes meanwhile
+    for key in [key for key in list(_INDEX_REGISTRY) if key[0] == source]:
+        _INDEX_REGISTRY.pop(key, None)
+
+
+# ============ RESULT CACHE ============
+class ResultCache:
+    """Bounded LRU cache of search results with hit/miss counters"""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = allocate_lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def load(self, path):
+        """Merge entries saved by a previous run; unreadable files are ignored"""
+        try:
+            with open(path, 'rb') as f:
+                header = pickle.load(f)
+                if header.get("version") != INDEX_VERSION:
+                    return
+                entries = pickle.load(f)
+        except (OSError, EOFError, AttributeError, pickle.UnpicklingError):
+            return
+        for key, value in list(entries.items())[-self.maxsize:]:
+            self.put(key, value)
+
+    def save(self, path):
+        with self._lock:
+            entries = OrderedDict(self._entries)
+        _write_index(Path(path), {"version": INDEX_VERSION}, entries)
+
+
+_RESULT_CACHE = ResultCache()
+
+
+def _persist_result_cache_path():
+    setting = os.environ.get(RESULT_CACHE_ENV, "")
+    if setting in ("", "0"):
+        return None
+    return INDEX_DIR / "results.cache" if setting == "1" else Path(setting)
+
+
+def enable_result_cache_persistence(path=None):
+    """Load cached results from disk now and write them back at interpreter exit"""
+    import atexit
+    path = Path(path) if path else INDEX_DIR / "results.cache"
+    _RESULT_CACHE.load(path)
+    atexit.register(_RESULT_CACHE.save, path)
+
+
+def cache_info():
+    """Hit/miss counters and size of the search result cache"""
+    return _RESULT_CACHE.info()
+
+
+def clear_cache():
+    """Empty the search result cache and reset its counters"""
+    _RESULT_CACHE.clear()
+
+
+# ============ CORPUS REGISTRATION ============
+def register_domain(name, file, search_cols, output_cols=None, weights=None, keywords=None):
+    """Add (or replace) a search domain backed by any CSV file
+
+    file is absolute or relative to DATA_DIR. output_cols defaults to
+    search_cols, weights feeds BM25F scoring and keywords lets detect_domain
+    route queries to the domain. Returns the config entry.
+    """
+    if name == "all":
+        raise ValueError("'all' is reserved for federated search")
+    if not search_cols:
+        raise ValueError(f"Domain {name!r} needs at least one search column")
+    config = {"file": str(file), "search_cols": list(search_cols), "output_cols": list(output_cols or search_cols)}
+    if weights:
+        config["weights"] = dict(weights)
+    if keywords:
+        config["keywords"] = [keyword.lower() for keyword in keywords]
+    CSV_CONFIG[name] = config
+    return config
+
+
+def register_stack(name, file, search_cols=None, output_cols=None, weights=None):
+    """Add (or replace) a stack; columns and weights default to the bundled stacks' _STACK_COLS"""
+    if name == "all":
+        raise ValueError("'all' is reserved for searching every stack")
+    config = {"file": str(file)}
+    if search_cols:
+        config["search_cols"] = list(search_cols)
+    if output_cols:
+        config["output_cols"] = list(output_cols)
+    if weights:
+        config["weights"] = dict(weights)
+    STACK_CONFIG[name] = config
+    if name not in AVAILABLE_STACKS:
+        AVAILABLE_STACKS.append(name)
+    return config
+
+
+def _stack_config(stack):
+    """A stack's config with the shared _STACK_COLS filled in for whatever it does not set"""
+    return {**_STACK_COLS, **STACK_CONFIG[stack]}
+
+
+def discover_corpora(directory, errors=None):
+    """Register every CSV under directory that has a manifest next to it
+
+    styles.manifest.json beside styles.csv is a JSON object with "search_cols"
+    and optionally "type" ("domain", the default, or "stack"), "name"
+    (defaults to the CSV's stem), "file" (relative to the manifest),
+    "output_cols", "weights" and "keywords". Columns are checked against the
+    CSV header. Returns the registered (type, name) pairs.
+
+    A bad manifest raises ValueError (OSError when unreadable); given an
+    errors list, its message is appended there instead and the other
+    manifests are still registered.
+    """
+    registered = []
+    for manifest_path in sorted(Path(directory).rglob(f"*{MANIFEST_SUFFIX}")):
+        try:
+            registered.append(_register_manifest(manifest_path))
+        except (OSError, ValueError) as e:
+            if errors is None:
+                raise
+            errors.append(str(e))
+    return registered
+
+
+def _register_manifest(manifest_path):
+    """Validate one corpus manifest and register its CSV; returns (type, name)"""
+    import csv
+    import json
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except ValueError as e:
+        raise ValueError(f"{manifest_path}: invalid JSON ({e})")
+    if not isinstance(manifest, dict):
+        raise ValueError(f"{manifest_path}: manifest must be a JSON object")
+
+    stem = manifest_path.name[:-len(MANIFEST_SUFFIX)]
+    filepath = (manifest_path.parent / manifest.get("file", f"{stem}.csv")).resolve()
+    if not filepath.exists():
+        raise ValueError(f"{manifest_path}: CSV not found: {filepath}")
+    kind = manifest.get("type", "domain")
+    name = manifest.get("name", stem)
+
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        header = next(csv.reader(f), [])
+    columns = list(manifest.get("search_cols", [])) + list(manifest.get("output_cols", []))
+    missing = [col for col in columns if col not in header]
+    if missing:
+        raise ValueError(f"{manifest_path}: columns not in {filepath.name}: {', '.join(missing)}")
+
+    if kind not in ("domain", "stack"):
+        raise ValueError(f"{manifest_path}: unknown type {kind!r} (expected 'domain' or 'stack')")
+    try:
+        if kind == "domain":
+            register_domain(name, filepath, manifest.get("search_cols"), manifest.get("output_cols"),
+                            manifest.get("weights"), manifest.get("keywords"))
+        else:
+            register_stack(name, filepath, manifest.get("search_cols"), manifest.get("output_cols"),
+                           manifest.get("weights"))
+    except ValueError as e:
+        raise ValueError(f"{manifest_path}: {e}")
+    return kind, name
 
 
 # ============ SEARCH FUNCTIONS ============
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+    return load_rows(filepath)
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
+def _search_csv(filepath, search_cols, output_cols, query, max_results, weights=None, query_tokens=None):
+    """Core search function using BM25, answered from the result cache when possible
 
-    data = _load_csv(filepath)
+    query_tokens: the query already run through DEFAULT_TOKENIZER, when the
+    caller searches several CSVs with one query.
+    """
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return []
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    # Queries that tokenize identically rank identically; the CSV's mtime
+    # and size in the key retire entries as soon as the data changes
+    if query_tokens is None:
+        query_tokens = DEFAULT_TOKENIZER(query)
+    key = (str(filepath), tuple(search_cols), tuple(output_cols), weights, query_tokens,
+           max_results, stat.st_mtime_ns, stat.st_size)
+    results = _RESULT_CACHE.get(key)
+    if results is None:
+        index = get_index(filepath, search_cols, weights)
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
+        # BM25 search, with typos and partial words expanded to indexed terms
+        if index.bm25.tokenizer is not DEFAULT_TOKENIZER:
+            query_tokens = index.bm25.tokenize(query)
+        if FUZZY_MATCHING:
+            query_tokens = index.bm25.expand(query_tokens)
+        ranked = index.bm25.score_tokens(query_tokens, max_results)
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+        # Get top results with score > 0
+        results = index.rows.project([idx for idx, score in ranked if score > 0], output_cols)
+        _RESULT_CACHE.put(key, results)
 
-    return results
+    return [dict(row) for row in results]
 
 
 def detect_domain(query):
@@ -209,23 +1465,36 @@ def detect_domain(query):
         "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
     }
 
+    for domain, config in CSV_CONFIG.items():
+        if config.get("keywords"):
+            domain_keywords[domain] = domain_keywords.get(domain, []) + config["keywords"]
+
     scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
     best = max(scores, key=scores.get)
     return best if scores[best] > 0 else "style"
 
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+def search(query, domain=None, max_results=MAX_RESULTS, scoring=None):
+    """Main search function with auto-domain detection ("all" searches every domain)
+
+    scoring: "bm25" or "bm25f" (field-weighted), defaults to SCORING.
+    """
+    if domain == "all":
+        return search_all(query, max_results, scoring=scoring)
     if domain is None:
         domain = detect_domain(query)
 
-    config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
+    if domain not in CSV_CONFIG:
+        return {"error": f"Unknown domain: {domain}. Available: {', '.join(CSV_CONFIG)}, all", "domain": domain}
+
+    config = CSV_CONFIG[domain]
     filepath = DATA_DIR / config["file"]
 
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results,
+                          field_weights(config, scoring))
 
     return {
         "domain": domain,
@@ -236,17 +1505,19 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     }
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
+def search_stack(query, stack, max_results=MAX_RESULTS, scoring=None, query_tokens=None):
     """Search stack-specific guidelines"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
 
-    filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
+    config = _stack_config(stack)
+    filepath = DATA_DIR / config["file"]
 
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results,
+                          field_weights(config, scoring), query_tokens)
 
     return {
         "domain": "stack",
@@ -256,3 +1527,164 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+def parse_stacks(stacks):
+    """Stack names from None/"all" (every stack), a comma-separated string or a list"""
+    if stacks is None or stacks == "all":
+        return list(AVAILABLE_STACKS)
+    if isinstance(stacks, str):
+        stacks = stacks.split(",")
+    return [stack.strip() for stack in stacks if stack.strip()]
+
+
+def search_stacks(query, stacks=None, max_results=MAX_RESULTS, scoring=None):
+    """Search several stacks at once, results grouped by stack
+
+    stacks is anything parse_stacks accepts (default: every stack). The query
+    is tokenized once, and when several stack indexes are not loaded yet the
+    stacks are searched on a thread pool so those loads overlap. Stacks that cannot be searched are reported
+    under "errors" instead of failing the whole call.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    stacks = parse_stacks(stacks)
+    query_tokens = DEFAULT_TOKENIZER(query)
+    search_one = lambda stack: search_stack(query, stack, max_results, scoring, query_tokens)
+
+    # Scoring holds the GIL, so threads only pay off while indexes are still loading
+    loaded = {key[0] for key in list(_INDEX_REGISTRY)}  # snapshot: other threads may be loading
+    cold = [stack for stack in stacks
+            if stack in STACK_CONFIG and str((DATA_DIR / STACK_CONFIG[stack]["file"]).resolve()) not in loaded]
+    if len(cold) < 2:
+        answers = list(map(search_one, stacks))
+    else:
+        with ThreadPoolExecutor(max_workers=min(STACK_WORKERS, len(cold))) as pool:
+            answers = list(pool.map(search_one, stacks))
+
+    grouped, files, errors = {}, {}, {}
+    for stack, answer in zip(stacks, answers):
+        if "error" in answer:
+            errors[stack] = answer["error"]
+        else:
+            grouped[stack] = answer["results"]
+            files[stack] = answer["file"]
+    result = {
+        "domain": "stack",
+        "stacks": list(grouped),
+        "query": query,
+        "files": files,
+        "count": sum(len(rows) for rows in grouped.values()),
+        "results": grouped
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def _request_error(item):
+    """Why a search_many() request cannot be answered, or None when it is well formed"""
+    query = item.get("query")
+    if not query:
+        return "Missing query"
+    if not isinstance(query, str):
+        return f"Query must be a string, got {type(query).__name__}"
+    domain = item.get("domain")
+    if domain is not None and domain != "all" and domain not in CSV_CONFIG:
+        return f"Unknown domain: {domain}. Available: {', '.join(CSV_CONFIG)}, all"
+    stack = item.get("stack")
+    if stack is not None and not isinstance(stack, str) and not (
+            isinstance(stack, list) and all(isinstance(name, str) for name in stack)):
+        return "Stack must be a name, a comma-separated string or a list of names"
+    limit = item.get("max_results")
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 1):
+        return f"max_results must be a positive integer, got {limit!r}"
+    scoring = item.get("scoring")
+    if scoring is not None and scoring not in SCORING_MODES:
+        return f"Unknown scoring mode: {scoring}"
+    return None
+
+
+def search_many(queries, domain=None, max_results=MAX_RESULTS):
+    """Answer many queries against the shared indexes, one result per query
+
+    Each item is a query string or a dict with "query" and optional
+    "domain", "stack", "max_results" and "scoring" keys overriding the defaults.
+    A "stack" of "all", a comma-separated string or a list runs search_stacks.
+    """
+    results = []
+    for item in queries:
+        if not isinstance(item, dict):
+            item = {"query": item}
+        error = _request_error(item)
+        if error:
+            results.append({"error": error, "request": item})
+            continue
+        query = item["query"]
+        limit = item.get("max_results", max_results)
+        scoring = item.get("scoring")
+        if isinstance(item.get("stack"), list) or item.get("stack") == "all" or "," in (item.get("stack") or ""):
+            results.append(search_stacks(query, item["stack"], limit, scoring))
+        elif item.get("stack"):
+            results.append(search_stack(query, item["stack"], limit, scoring))
+        else:
+            results.append(search(query, item.get("domain", domain), limit, scoring))
+    return results
+
+
+def search_all(query, max_results=MAX_RESULTS, domains=None, scoring=None):
+    """Federated search: rank hits from every domain on one normalized scale
+
+    Raw BM25 scores are not comparable across CSVs (different IDF and
+    document lengths), so each domain's scores are divided by that domain's
+    upper bound for the whole query, giving a relevance in [0, 1). Query
+    tokens a domain has no term for still count in its bound, so a domain
+    matching one of two words cannot outrank one matching both. The query is
+    tokenized once and each domain contributes at most max_results hits.
+    """
+    import heapq
+    domains = list(domains or CSV_CONFIG)
+    query_tokens = DEFAULT_TOKENIZER(query)
+
+    hits = []
+    for order, domain in enumerate(domains):
+        config = CSV_CONFIG[domain]
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        index = get_index(filepath, config["search_cols"], field_weights(config, scoring))
+        bm25 = index.bm25
+        if FUZZY_MATCHING:
+            tokens, unmatched = bm25.expand_counting(query_tokens)
+        else:
+            tokens, unmatched = query_tokens, sum(1 for token in query_tokens if token not in bm25.vocab)
+        bound = bm25.max_score(tokens, unmatched)
+        if bound <= 0 or not tokens:
+            continue
+        for rank, (idx, score) in enumerate(bm25.score_tokens(tokens, max_results)):
+            hits.append((score / bound, order, rank, domain, index, idx))
+
+    results = []
+    for relevance, _, _, domain, index, idx in heapq.nsmallest(max_results, hits, key=lambda x: (-x[0], x[1], x[2])):
+        hit = {"Domain": domain, "Relevance": round(relevance, 4)}
+        hit.update(index.rows.project([idx], CSV_CONFIG[domain]["output_cols"])[0])
+        results.append(hit)
+
+    return {
+        "domain": "all",
+        "query": query,
+        "file": ", ".join(sorted({CSV_CONFIG[hit["Domain"]]["file"] for hit in results})) or "-",
+        "count": len(results),
+        "results": results
+    }
+
+
+if _persist_result_cache_path():
+    enable_result_cache_persistence(_persist_result_cache_path())
+
+# A broken manifest must not make core, and with it every search, unimportable
+_corpus_errors = []
+for _corpus_dir in filter(None, os.environ.get(CORPORA_ENV, "").split(os.pathsep)):
+    discover_corpora(_corpus_dir, _corpus_errors)
+for _corpus_error in _corpus_errors:
+    sys.stderr.write(f"Warning: ${CORPORA_ENV}: skipped {_corpus_error}\n")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Daemon - keeps every search index warm in memory and answers
+JSON requests over a Unix domain socket.
+
+Usage:
+    python search.py --serve [--socket PATH]
+    python search.py "<query>"        # transparently uses the daemon when it is running
+
+Protocol: one JSON document per line. A request is an object accepted by
+core.search_many() ({"query", "domain", "stack", "max_results", "scoring"}) or a list of
+such objects; the reply is the matching result object or list. {"op": "ping"}
+returns {"status": "ok"}, the daemon's install identity and the result
+cache's hit/miss counters.
+
+Every copy of the kit (one per project's .agent/) gets its own default socket,
+named after its install identity: the data directory, core.py and the
+environment that changes answers. request() pings first and falls back to
+in-process search when the daemon serves another install.
+
+The server classes live in daemon_server.py; this module only imports what a
+client needs, and socket and json only once a daemon socket exists.
+"""
+
+import os
+import sys
+import zlib
+
+# ============ CONFIGURATION ============
+SOCKET_ENV = "UI_PRO_MAX_SOCKET"
+CONNECT_TIMEOUT = 0.05  # seconds; keeps the fallback path fast when no daemon runs
+REPLY_TIMEOUT = 10.0
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+IDENTITY_ENV = ("UI_PRO_MAX_CORPORA", "UI_PRO_MAX_SCORING")  # environment a daemon's answers depend on
+
+
+def install_id():
+    """Short hash naming this install: its data directory, core.py version and search environment"""
+    core_stat = os.stat(os.path.join(SCRIPTS_DIR, "core.py"))
+    key = [os.path.realpath(os.path.join(SCRIPTS_DIR, os.pardir, "data")), str(core_stat.st_mtime_ns), str(core_stat.st_size)]
+    key += [os.environ.get(name, "") for name in IDENTITY_ENV]
+    return f"{zlib.crc32(chr(0).join(key).encode('utf-8')):08x}"
+
+
+def default_socket_path():
+    """Socket path from $UI_PRO_MAX_SOCKET, else a per-user, per-install path in the temp dir"""
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    uid = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(_temp_dir(), f"ui-ux-pro-max-{uid}-{install_id()}.sock")
+
+
+def _temp_dir():
+    # Importing tempfile costs more than a whole warm search; on POSIX its answer is $TMPDIR or /tmp
+    if os.name == "posix":
+        return os.environ.get("TMPDIR") or "/tmp"
+    import tempfile
+    return tempfile.gettempdir()
+
+
+# ============ CLIENT ============
+def _session(socket_path, payloads):
+    """Send payloads over one connection, yielding each reply before the next is sent; stops when unreachable"""
+    socket_path = socket_path or default_socket_path()
+    if not os.path.exists(socket_path):
+        return
+    import json
+    import socket
+    if not hasattr(socket, "AF_UNIX"):
+        return
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path)
+        sock.settimeout(REPLY_TIMEOUT)
+        with sock.makefile('rb') as replies:
+            for payload in payloads:
+                sock.sendall(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n")
+                line = replies.readline()
+                if not line:
+                    return
+                yield json.loads(line)
+    except (OSError, ValueError):
+        return
+    finally:
+        sock.close()
+
+
+def ping(socket_path=None):
+    """Ping reply of the daemon on socket_path, whichever install it serves; None when none is reachable"""
+    session = _session(socket_path, [{"op": "ping"}])
+    try:
+        return next(session, None)
+    finally:
+        session.close()
+
+
+def request(payload, socket_path=None):
+    """Send one request to this install's daemon; None when none is reachable or it serves another install"""
+    session = _session(socket_path, [{"op": "ping"}, payload])
+    try:
+        pong = next(session, None)
+        if not isinstance(pong, dict) or pong.get("install") != install_id():
+            return None
+        return next(session, None)
+    finally:
+        session.close()
+
+
+# ============ SERVER ============
+def serve(socket_path=None):
+    """Run the search daemon in the foreground until interrupted"""
+    import signal
+    import socket
+    from daemon_server import SearchServer
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Unix domain sockets are not supported on this platform")
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        if ping(socket_path):
+            raise OSError(f"A search daemon is already listening on {socket_path}")
+        os.unlink(socket_path)  # stale socket left by a killed daemon
+
+    server = SearchServer(socket_path)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # clean up the socket on kill
+    try:
+        print(f"UI Pro Max search daemon listening on {socket_path}", flush=True)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
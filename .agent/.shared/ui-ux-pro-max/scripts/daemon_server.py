@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Daemon Server - the listening half of daemon.py, kept apart so
+clients never import socketserver.
+"""
+
+import json
+import os
+import socketserver
+
+import daemon
+
+
+class _SearchHandler(socketserver.StreamRequestHandler):
+    """Answers newline-delimited JSON requests until the client disconnects"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                reply = self.server.answer(json.loads(line))
+            except ValueError as e:
+                reply = {"error": f"Invalid request: {e}"}
+            except Exception as e:  # one failing request must not drop the connection
+                reply = {"error": f"Search failed: {type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b"\n")
+            self.wfile.flush()
+
+
+class SearchServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server sharing core's in-process index registry"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        import core
+        self.core = core
+        self.install = daemon.install_id()  # fixed at startup: a later core.py edit must not match
+        self.sources = {}
+        super().__init__(socket_path, _SearchHandler)
+        self.warm()
+
+    def _targets(self):
+        core = self.core
+        targets = [(core.DATA_DIR / cfg["file"], cfg) for cfg in core.CSV_CONFIG.values()]
+        targets += [(core.DATA_DIR / cfg["file"], core._stack_config(stack)) for stack, cfg in core.STACK_CONFIG.items()]
+        return [(filepath, config) for filepath, config in targets if filepath.exists()]
+
+    def warm(self):
+        """Load every domain and stack index (default scoring mode) and remember the source mtimes"""
+        for filepath, config in self._targets():
+            self.core.get_index(filepath, config["search_cols"], self.core.field_weights(config))
+            self.sources[filepath] = filepath.stat().st_mtime_ns
+
+    def refresh(self):
+        """Drop indexes whose CSV changed since they were loaded"""
+        for filepath, mtime_ns in list(self.sources.items()):
+            try:
+                current = filepath.stat().st_mtime_ns
+            except OSError:
+                continue
+            if current != mtime_ns:
+                self.core.invalidate_indexes(filepath)
+                self.sources[filepath] = current
+
+    def answer(self, payload):
+        if isinstance(payload, dict) and payload.get("op") == "ping":
+            return {"status": "ok", "pid": os.getpid(), "install": self.install, "cache": self.core.cache_info()}
+        self.refresh()
+        if isinstance(payload, list):
+            return self.core.search_many(payload)
+        if isinstance(payload, dict):
+            return self.core.search_many([payload])[0]
+        return {"error": "Request must be a JSON object or list"}
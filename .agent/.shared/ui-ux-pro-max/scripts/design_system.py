@@ -11,14 +11,24 @@ Usage:
     # With persistence (Master + Overrides pattern)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
+
+    # Many projects and pages with one generator (see load_bulk_manifest for the format)
+    summary = generate_bulk(load_bulk_manifest("design-systems.json")["projects"])
+
+    # Stream straight to a file handle instead of building the string
+    generate_design_system("SaaS dashboard", "My Project", out=sys.stdout)
+    write_master_md(design_system, f)    # likewise write_page_override_md, write_ascii_box, write_markdown
 """
 
-import csv
+import hashlib
+import io
 import json
 import os
+import re
+import time
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+from core import CSV_CONFIG, INDEX_DIR, INDEX_VERSION, SCORING, ResultCache, search, load_rows, DATA_DIR
 
 
 # ============ CONFIGURATION ============
@@ -31,65 +41,133 @@ SEARCH_CONFIG = {
     "landing": {"max_results": 2},
     "typography": {"max_results": 2}
 }
+PAGE_SEARCH_CONFIG = {  # domains _generate_intelligent_overrides searches for page overrides
+    "style": {"max_results": 1},
+    "ux": {"max_results": 3},
+    "landing": {"max_results": 1}
+}
+SEARCH_WORKERS = 4  # threads _multi_domain_search uses in parallel mode
+
+GENERATOR_VERSION = 2  # bump whenever generate() or the Markdown formatters change their output
+DESIGN_CACHE_ENV = "UI_PRO_MAX_DESIGN_CACHE"  # "0" disables the design system cache
+DESIGN_CACHE_SIZE = 128  # entries kept in memory; every entry is also saved under .index/design-systems/
+DESIGN_CACHE_DISK_SIZE = 1024  # files kept under .index/design-systems/, least recently used evicted first
 
 
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
-    def __init__(self):
+    def __init__(self, parallel: bool = False):
+        # Searches share the process-wide indexes, so parallel mode needs no extra setup; it only
+        # pays off where loads or scoring release the GIL (slow storage, free-threaded builds)
+        self.parallel = parallel
         self.reasoning_data = self._load_reasoning()
+        self._index_reasoning()
 
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
         filepath = DATA_DIR / REASONING_FILE
         if not filepath.exists():
             return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
-
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
-        for domain, config in SEARCH_CONFIG.items():
-            if domain == "style" and style_priority:
-                # For style, also search with priority keywords
-                priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+        return load_rows(filepath)
+
+    def _multi_domain_search(self, query: str, style_priority=None, timings: dict = None) -> dict:
+        """Execute searches across multiple domains.
+
+        style_priority is a keyword list, or a callable deriving one from the
+        product search result (the style search then waits for product). Each
+        domain's search time in ms is recorded in timings.
+        """
+        timings = {} if timings is None else timings
+
+        def run(domain, domain_query):
+            start = time.perf_counter()
+            result = search(domain_query, domain, SEARCH_CONFIG[domain]["max_results"])
+            timings[domain] = round((time.perf_counter() - start) * 1000, 3)
+            return result
+
+        def style_query(product_result):
+            priority = style_priority(product_result) if callable(style_priority) else style_priority
+            if not priority:
+                return query
+            # For style, also search with priority keywords
+            return f"{query} {' '.join(priority[:2])}"
+
+        if not self.parallel:
+            results = {"product": run("product", query)}
+            results["style"] = run("style", style_query(results["product"]))
+            for domain in SEARCH_CONFIG:
+                if domain not in results:
+                    results[domain] = run(domain, query)
+            return results
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(SEARCH_WORKERS, len(SEARCH_CONFIG))) as pool:
+            futures = {domain: pool.submit(run, domain, query) for domain in SEARCH_CONFIG if domain != "style"}
+            if callable(style_priority):
+                futures["style"] = pool.submit(lambda: run("style", style_query(futures["product"].result())))
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                futures["style"] = pool.submit(run, "style", style_query(None))
+            return {domain: futures[domain].result() for domain in SEARCH_CONFIG}
 
-    def _find_reasoning_rule(self, category: str) -> dict:
-        """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
+    @staticmethod
+    def _product_category(product_result: dict) -> str:
+        """Product Type of the top product match, "General" without one."""
+        product_results = product_result.get("results", [])
+        return product_results[0].get("Product Type", "General") if product_results else "General"
+
+    def _index_reasoning(self):
+        """Precompute rule lookups: exact categories, keyword -> rule map and parsed Decision_Rules."""
+        self._categories = [rule.get("UI_Category", "").lower() for rule in self.reasoning_data]
+        self._exact_rules = {}
+        self._keyword_rules = {}
+        for i, ui_cat in enumerate(self._categories):
+            self._exact_rules.setdefault(ui_cat, i)
+            for kw in ui_cat.replace("/", " ").replace("-", " ").split():
+                self._keyword_rules.setdefault(kw, i)
+        # Ordered by first rule, so the first keyword found in a category names the rule a scan would pick
+        self._keywords = sorted(self._keyword_rules, key=self._keyword_rules.get)
+        self._decision_rules = [self._parse_decision_rules(rule) for rule in self.reasoning_data]
+        self._rule_cache = {}
+
+    @staticmethod
+    def _parse_decision_rules(rule: dict) -> dict:
+        """Parse a rule's Decision_Rules JSON, {} when missing or malformed."""
+        try:
+            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
+        except json.JSONDecodeError:
+            return {}
+        return decision_rules if isinstance(decision_rules, dict) else {}
 
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
+    def _find_reasoning_index(self, category: str) -> int:
+        """Index of the matching reasoning rule (exact, then partial, then keyword match), -1 if none."""
+        category_lower = category.lower()
+        index = self._rule_cache.get(category_lower)
+        if index is not None:
+            return index
 
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
+        index = self._exact_rules.get(category_lower)
+        if index is None:
+            index = next((i for i, ui_cat in enumerate(self._categories)
+                          if ui_cat in category_lower or category_lower in ui_cat), None)
+        if index is None:
+            index = next((self._keyword_rules[kw] for kw in self._keywords if kw in category_lower), -1)
 
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
+        self._rule_cache[category_lower] = index
+        return index
 
-        return {}
+    def _find_reasoning_rule(self, category: str) -> dict:
+        """Find matching reasoning rule for a category."""
+        index = self._find_reasoning_index(category)
+        return self.reasoning_data[index] if index >= 0 else {}
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
+        index = self._find_reasoning_index(category)
 
-        if not rule:
+        if index < 0:
             return {
                 "pattern": "Hero + Features + CTA",
                 "style_priority": ["Minimalism", "Flat Design"],
@@ -101,13 +179,7 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
+        rule = self.reasoning_data[index]
         return {
             "pattern": rule.get("Recommended_Pattern", ""),
             "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
@@ -115,7 +187,7 @@ class DesignSystemGenerator:
             "typography_mood": rule.get("Typography_Mood", ""),
             "key_effects": rule.get("Key_Effects", ""),
             "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
+            "decision_rules": dict(self._decision_rules[index]),
             "severity": rule.get("Severity", "MEDIUM")
         }
 
@@ -161,21 +233,19 @@ class DesignSystemGenerator:
         return search_result.get("results", [])
 
     def generate(self, query: str, project_name: str = None) -> dict:
-        """Generate complete design system recommendation."""
-        # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
-        product_results = product_result.get("results", [])
-        category = "General"
-        if product_results:
-            category = product_results[0].get("Product Type", "General")
-
-        # Step 2: Get reasoning rules for this category
+        """Generate complete design system recommendation.
+
+        The result's "timings" holds each domain search and the total in ms.
+        """
+        start = time.perf_counter()
+        timings = {}
+
+        # Steps 1-3: Multi-domain search; the product's category picks the reasoning
+        # rule whose style priority steers the style search
+        search_results = self._multi_domain_search(
+            query, lambda product: self._apply_reasoning(self._product_category(product), {})["style_priority"], timings)
+        category = self._product_category(search_results["product"])
         reasoning = self._apply_reasoning(category, {})
-        style_priority = reasoning.get("style_priority", [])
-
-        # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -232,15 +302,49 @@ class DesignSystemGenerator:
             "key_effects": combined_effects,
             "anti_patterns": reasoning.get("anti_patterns", ""),
             "decision_rules": reasoning.get("decision_rules", {}),
-            "severity": reasoning.get("severity", "MEDIUM")
+            "severity": reasoning.get("severity", "MEDIUM"),
+            "timings": {**timings, "total": round((time.perf_counter() - start) * 1000, 3)}
         }
 
 
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
-def format_ascii_box(design_system: dict) -> str:
-    """Format design system as ASCII box with emojis (MCP-style)."""
+class _LineWriter:
+    """Streams lines to a text file object exactly as "\\n".join(lines) would lay them out."""
+
+    def __init__(self, out):
+        self.out = out
+        self.started = False
+
+    def append(self, line: str):
+        if self.started:
+            self.out.write("\n")
+        self.out.write(line)
+        self.started = True
+
+
+def _wrap_text(text: str, prefix: str, width: int) -> list:
+    """Wrap long text into multiple lines."""
+    if not text:
+        return []
+    words = text.split()
+    lines = []
+    current_line = prefix
+    for word in words:
+        if len(current_line) + len(word) + 1 <= width - 2:
+            current_line += (" " if current_line != prefix else "") + word
+        else:
+            if current_line != prefix:
+                lines.append(current_line)
+            current_line = prefix + word
+    if current_line != prefix:
+        lines.append(current_line)
+    return lines
+
+
+def write_ascii_box(design_system: dict, out) -> None:
+    """Stream the design system as an ASCII box with emojis (MCP-style) to a text file object."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -249,30 +353,12 @@ def format_ascii_box(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    def wrap_text(text: str, prefix: str, width: int) -> list:
-        """Wrap long text into multiple lines."""
-        if not text:
-            return []
-        words = text.split()
-        lines = []
-        current_line = prefix
-        for word in words:
-            if len(current_line) + len(word) + 1 <= width - 2:
-                current_line += (" " if current_line != prefix else "") + word
-            else:
-                if current_line != prefix:
-                    lines.append(current_line)
-                current_line = prefix + word
-        if current_line != prefix:
-            lines.append(current_line)
-        return lines
-
     # Build sections from pattern
     sections = pattern.get("sections", "").split(">")
     sections = [s.strip() for s in sections if s.strip()]
 
     # Build output lines
-    lines = []
+    lines = _LineWriter(out)
     w = BOX_WIDTH - 1
 
     lines.append("+" + "-" * w + "+")
@@ -294,10 +380,10 @@ def format_ascii_box(design_system: dict) -> str:
     # Style section
     lines.append(f"|  STYLE: {style.get('name', '')}".ljust(BOX_WIDTH) + "|")
     if style.get("keywords"):
-        for line in wrap_text(f"Keywords: {style.get('keywords', '')}", "|     ", BOX_WIDTH):
+        for line in _wrap_text(f"Keywords: {style.get('keywords', '')}", "|     ", BOX_WIDTH):
             lines.append(line.ljust(BOX_WIDTH) + "|")
     if style.get("best_for"):
-        for line in wrap_text(f"Best For: {style.get('best_for', '')}", "|     ", BOX_WIDTH):
+        for line in _wrap_text(f"Best For: {style.get('best_for', '')}", "|     ", BOX_WIDTH):
             lines.append(line.ljust(BOX_WIDTH) + "|")
     if style.get("performance") or style.get("accessibility"):
         perf_a11y = f"Performance: {style.get('performance', '')} | Accessibility: {style.get('accessibility', '')}"
@@ -312,17 +398,17 @@ def format_ascii_box(design_system: dict) -> str:
     lines.append(f"|     Background: {colors.get('background', '')}".ljust(BOX_WIDTH) + "|")
     lines.append(f"|     Text:       {colors.get('text', '')}".ljust(BOX_WIDTH) + "|")
     if colors.get("notes"):
-        for line in wrap_text(f"Notes: {colors.get('notes', '')}", "|     ", BOX_WIDTH):
+        for line in _wrap_text(f"Notes: {colors.get('notes', '')}", "|     ", BOX_WIDTH):
             lines.append(line.ljust(BOX_WIDTH) + "|")
     lines.append("|" + " " * BOX_WIDTH + "|")
 
     # Typography section
     lines.append(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}".ljust(BOX_WIDTH) + "|")
     if typography.get("mood"):
-        for line in wrap_text(f"Mood: {typography.get('mood', '')}", "|     ", BOX_WIDTH):
+        for line in _wrap_text(f"Mood: {typography.get('mood', '')}", "|     ", BOX_WIDTH):
             lines.append(line.ljust(BOX_WIDTH) + "|")
     if typography.get("best_for"):
-        for line in wrap_text(f"Best For: {typography.get('best_for', '')}", "|     ", BOX_WIDTH):
+        for line in _wrap_text(f"Best For: {typography.get('best_for', '')}", "|     ", BOX_WIDTH):
             lines.append(line.ljust(BOX_WIDTH) + "|")
     if typography.get("google_fonts_url"):
         lines.append(f"|     Google Fonts: {typography.get('google_fonts_url', '')}".ljust(BOX_WIDTH) + "|")
@@ -333,14 +419,14 @@ def format_ascii_box(design_system: dict) -> str:
     # Key Effects section
     if effects:
         lines.append("|  KEY EFFECTS:".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(effects, "|     ", BOX_WIDTH):
+        for line in _wrap_text(effects, "|     ", BOX_WIDTH):
             lines.append(line.ljust(BOX_WIDTH) + "|")
         lines.append("|" + " " * BOX_WIDTH + "|")
 
     # Anti-patterns section
     if anti_patterns:
         lines.append("|  AVOID (Anti-patterns):".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(anti_patterns, "|     ", BOX_WIDTH):
+        for line in _wrap_text(anti_patterns, "|     ", BOX_WIDTH):
             lines.append(line.ljust(BOX_WIDTH) + "|")
         lines.append("|" + " " * BOX_WIDTH + "|")
 
@@ -361,11 +447,16 @@ def format_ascii_box(design_system: dict) -> str:
 
     lines.append("+" + "-" * w + "+")
 
-    return "\n".join(lines)
 
+def format_ascii_box(design_system: dict) -> str:
+    """Format design system as ASCII box with emojis (MCP-style)."""
+    buffer = io.StringIO()
+    write_ascii_box(design_system, buffer)
+    return buffer.getvalue()
 
-def format_markdown(design_system: dict) -> str:
-    """Format design system as markdown."""
+
+def write_markdown(design_system: dict, out) -> None:
+    """Stream design system as markdown to a text file object."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -374,7 +465,7 @@ def format_markdown(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    lines = []
+    lines = _LineWriter(out)
     lines.append(f"## Design System: {project}")
     lines.append("")
 
@@ -455,12 +546,18 @@ def format_markdown(design_system: dict) -> str:
     lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
     lines.append("")
 
-    return "\n".join(lines)
+
+def format_markdown(design_system: dict) -> str:
+    """Format design system as markdown."""
+    buffer = io.StringIO()
+    write_markdown(design_system, buffer)
+    return buffer.getvalue()
 
 
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           use_cache: bool = True, out=None) -> str:
     """
     Main entry point for design system generation.
 
@@ -471,22 +568,145 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
+        use_cache: If False, regenerate even when a cached design system matches
+        out: Optional text file object (e.g. sys.stdout) to stream the output to
 
     Returns:
-        Formatted design system string
+        Formatted design system string, or None when it was streamed to out
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
+    pages = [(page, query)] if page else []
+    entry = _cached_design_system(query, project_name, pages, render=persist, use_cache=use_cache)
+    design_system = entry["design_system"]
     
     # Persist to files if requested
     if persist:
-        persist_design_system(design_system, page, output_dir, query)
+        _write_files(_design_system_dir(design_system, output_dir), entry["files"])
 
+    if out is not None:
+        writer = write_markdown if output_format == "markdown" else write_ascii_box
+        writer(design_system, out)
+        out.write("\n")
+        return None
     if output_format == "markdown":
         return format_markdown(design_system)
     return format_ascii_box(design_system)
 
 
+# ============ DESIGN SYSTEM CACHE ============
+_DESIGN_CACHE = ResultCache(DESIGN_CACHE_SIZE)
+_DATA_HASHES = {}  # (path, mtime_ns, size) -> content SHA-1
+
+
+def _data_fingerprint() -> list:
+    """Content hashes of the CSVs a design system and its page overrides are built from; files are rehashed only after they change."""
+    domains = set(SEARCH_CONFIG) | set(PAGE_SEARCH_CONFIG)
+    names = sorted({CSV_CONFIG[domain]["file"] for domain in domains if domain in CSV_CONFIG} | {REASONING_FILE})
+    fingerprint = []
+    for name in names:
+        filepath = DATA_DIR / name
+        try:
+            stat = filepath.stat()
+        except OSError:
+            fingerprint.append([name, None])
+            continue
+        stamp = (str(filepath), stat.st_mtime_ns, stat.st_size)
+        if stamp not in _DATA_HASHES:
+            with open(filepath, 'rb') as f:
+                _DATA_HASHES[stamp] = hashlib.sha1(f.read()).hexdigest()
+        fingerprint.append([name, _DATA_HASHES[stamp]])
+    return fingerprint
+
+
+def design_system_cache_key(query: str, project_name: str = None, pages: list = ()) -> str:
+    """Content address of a design system: request, (page, page_query) pairs, data hashes and versions."""
+    key = [GENERATOR_VERSION, INDEX_VERSION, SCORING, query, project_name, [list(p) for p in pages], _data_fingerprint()]
+    return hashlib.sha1(json.dumps(key, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return INDEX_DIR / "design-systems" / f"{key}.json"
+
+
+def _cached_design_system(query: str, project_name: str, pages: list, render: bool,
+                          use_cache: bool = True, generator: "DesignSystemGenerator" = None) -> dict:
+    """
+    {"design_system", "files", "cached"} for a request, from the cache when its key matches.
+
+    files maps paths relative to the design system folder to rendered Markdown
+    (MASTER.md and pages/*.md); it is only rendered when render is set.
+    Only a fresh design system carries "timings"; they describe the run that
+    generated it, so cached entries are stored without them.
+    """
+    use_cache = use_cache and os.environ.get(DESIGN_CACHE_ENV, "1") != "0"
+    key = design_system_cache_key(query, project_name, pages) if use_cache else None
+    entry = _load_cache_entry(key) if use_cache else None
+    if entry is not None and (entry["files"] is not None or not render):
+        return {**entry, "cached": True}
+
+    design_system = entry["design_system"] if entry else (generator or DesignSystemGenerator()).generate(query, project_name)
+    entry = {"design_system": design_system, "files": _render_files(design_system, pages) if render else None}
+    if use_cache:
+        cached_system = {k: v for k, v in design_system.items() if k != "timings"}
+        _store_cache_entry(key, {**entry, "design_system": cached_system})
+    return {**entry, "cached": False}
+
+
+def _load_cache_entry(key: str):
+    entry = _DESIGN_CACHE.get(key)
+    if entry is None:
+        try:
+            with open(_cache_path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(_cache_path(key))  # recently used entries survive _prune_disk_cache
+        except (OSError, ValueError):
+            return None
+        _DESIGN_CACHE.put(key, entry)
+    return entry
+
+
+def _store_cache_entry(key: str, entry: dict):
+    """Keep an entry in memory and write it to disk atomically; silently skip on read-only installs."""
+    _DESIGN_CACHE.put(key, entry)
+    path = _cache_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        _prune_disk_cache(path.parent)
+    except OSError:
+        pass
+
+
+def _prune_disk_cache(cache_dir: Path, limit: int = DESIGN_CACHE_DISK_SIZE):
+    """Delete the least recently used entries past limit."""
+    entries = []
+    for path in cache_dir.glob("*.json"):
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            pass
+    if len(entries) <= limit:
+        return
+    for _, path in sorted(entries)[:len(entries) - limit]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def clear_design_system_cache():
+    """Forget cached design systems, in memory and on disk."""
+    _DESIGN_CACHE.clear()
+    cache_dir = INDEX_DIR / "design-systems"
+    for path in cache_dir.glob("*.json") if cache_dir.is_dir() else []:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
 # ============ PERSISTENCE FUNCTIONS ============
 def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
     """
@@ -501,46 +721,82 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     Returns:
         dict with created file paths and status
     """
+    return _persist_pages(design_system, [(page, page_query)] if page else [], output_dir)
+
+
+def _persist_pages(design_system: dict, pages: list, output_dir: str = None) -> dict:
+    """Write MASTER.md once plus one override file per (page, page_query) pair."""
+    return _write_files(_design_system_dir(design_system, output_dir), _render_files(design_system, pages))
+
+
+def _design_system_dir(design_system: dict, output_dir: str = None) -> Path:
+    """design-system/<project> folder under output_dir (defaults to current working directory)."""
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
     # Use project name for project-specific folder
     project_name = design_system.get("project_name", "default")
     project_slug = project_name.lower().replace(' ', '-')
+    return base_dir / "design-system" / project_slug
+
+
+def _render_files(design_system: dict, pages: list) -> dict:
+    """MASTER.md and page override Markdown, keyed by path relative to the design system folder."""
+    files = {"MASTER.md": format_master_md(design_system)}
     
-    design_system_dir = base_dir / "design-system" / project_slug
+    # Page override files with intelligent content
+    for page, page_query in pages:
+        files[f"pages/{page.lower().replace(' ', '-')}.md"] = format_page_override_md(design_system, page, page_query)
+    return files
+
+
+def _write_files(design_system_dir: Path, files: dict) -> dict:
+    """Write rendered files, leaving those whose content (timestamp aside) is already on disk untouched."""
     pages_dir = design_system_dir / "pages"
     
     created_files = []
+    unchanged_files = []
     
     # Create directories
     design_system_dir.mkdir(parents=True, exist_ok=True)
     pages_dir.mkdir(parents=True, exist_ok=True)
     
-    master_file = design_system_dir / "MASTER.md"
-    
-    # Generate and write MASTER.md
-    master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
-    created_files.append(str(master_file))
-    
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+    for relative_path, content in files.items():
+        path = design_system_dir / relative_path
+        if _write_file(path, content):
+            created_files.append(str(path))
+        else:
+            unchanged_files.append(str(path))
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files + unchanged_files,
+        "unchanged_files": unchanged_files
     }
 
 
-def format_master_md(design_system: dict) -> str:
-    """Format design system as MASTER.md with hierarchical override logic."""
+_GENERATED_LINE = re.compile(r"^(> )?\*\*Generated:\*\* .*$", re.MULTILINE)
+
+
+def _write_file(path: Path, content: str) -> bool:
+    """Write a persisted Markdown file; False when it already held this content.
+
+    Only the "Generated:" timestamp may differ, so regenerating unchanged
+    output does not touch the file (no watcher or git churn).
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if _GENERATED_LINE.sub("", f.read()) == _GENERATED_LINE.sub("", content):
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+def write_master_md(design_system: dict, out) -> None:
+    """Stream design system as MASTER.md with hierarchical override logic to a text file object."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -551,7 +807,7 @@ def format_master_md(design_system: dict) -> str:
     
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    lines = []
+    lines = _LineWriter(out)
     
     # Logic header
     lines.append("# Design System Master File")
@@ -798,12 +1054,17 @@ def format_master_md(design_system: dict) -> str:
     lines.append("- [ ] No content hidden behind fixed navbars")
     lines.append("- [ ] No horizontal scroll on mobile")
     lines.append("")
-    
-    return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
-    """Format a page-specific override file with intelligent AI-generated content."""
+def format_master_md(design_system: dict) -> str:
+    """Format design system as MASTER.md with hierarchical override logic."""
+    buffer = io.StringIO()
+    write_master_md(design_system, buffer)
+    return buffer.getvalue()
+
+
+def write_page_override_md(design_system: dict, page_name: str, out, page_query: str = None) -> None:
+    """Stream a page-specific override file with intelligent AI-generated content to a text file object."""
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
@@ -811,7 +1072,7 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     # Detect page type and generate intelligent overrides
     page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
     
-    lines = []
+    lines = _LineWriter(out)
     
     lines.append(f"# {page_title} Page Overrides")
     lines.append("")
@@ -907,8 +1168,13 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
         for rec in recommendations:
             lines.append(f"- {rec}")
     lines.append("")
-    
-    return "\n".join(lines)
+
+
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
+    """Format a page-specific override file with intelligent AI-generated content."""
+    buffer = io.StringIO()
+    write_page_override_md(design_system, page_name, buffer, page_query)
+    return buffer.getvalue()
 
 
 def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
@@ -925,9 +1191,9 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
     combined_context = f"{page_lower} {query_lower}"
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    style_search = search(combined_context, "style", PAGE_SEARCH_CONFIG["style"]["max_results"])
+    ux_search = search(combined_context, "ux", PAGE_SEARCH_CONFIG["ux"]["max_results"])
+    landing_search = search(combined_context, "landing", PAGE_SEARCH_CONFIG["landing"]["max_results"])
     
     # Extract results from search response
     style_results = style_search.get("results", [])
@@ -1052,6 +1318,116 @@ def _detect_page_type(context: str, style_results: list) -> str:
     return "General"
 
 
+# ============ BULK GENERATION ============
+def load_bulk_manifest(path: str) -> dict:
+    """
+    Read a bulk manifest: JSON, or YAML (.yaml/.yml) when PyYAML is installed.
+
+    The manifest is a list of projects or {"output_dir": ..., "projects": [...]};
+    output_dir is resolved relative to the manifest. Each project is
+    {"query", "project_name", "pages"} where a page is a name or {"name", "query"}.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError(f"{path}: YAML manifests need PyYAML (pip install pyyaml); use JSON instead")
+            try:
+                manifest = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"{path}: {e}")
+        else:
+            try:
+                manifest = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}: {e}")
+
+    if isinstance(manifest, list):
+        manifest = {"projects": manifest}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("projects"), list):
+        raise ValueError(f'{path}: expected a list of projects or an object with a "projects" list')
+    if manifest.get("output_dir"):
+        manifest["output_dir"] = str(path.parent / manifest["output_dir"])
+    return manifest
+
+
+def _bulk_pages(project: dict, query: str) -> list:
+    """(page, page_query) pairs of a manifest project; page queries default to the project's."""
+    pages = []
+    for page in project.get("pages") or []:
+        if isinstance(page, dict):
+            page, page_query = page.get("name"), page.get("query") or query
+        else:
+            page_query = query
+        if not isinstance(page, str) or not page.strip():
+            raise ValueError(f"Invalid page entry: {page!r}")
+        pages.append((page, page_query))
+    return pages
+
+
+def generate_bulk(projects: list, output_dir: str = None, generator: DesignSystemGenerator = None,
+                  use_cache: bool = True) -> dict:
+    """
+    Generate and persist design systems for many projects and pages in one run.
+
+    Args:
+        projects: Manifest projects (see load_bulk_manifest); a plain string is a query
+        output_dir: Optional output directory (defaults to current working directory)
+        generator: Optional DesignSystemGenerator to reuse (one is created otherwise)
+        use_cache: If False, regenerate even when a cached design system matches
+
+    Returns:
+        dict with per-project timings and files, totals, and per-item errors
+    """
+    start = time.perf_counter()
+    generator = generator or DesignSystemGenerator()
+    items, errors = [], []
+
+    for position, project in enumerate(projects, 1):
+        if isinstance(project, str):
+            project = {"query": project}
+        try:
+            if not isinstance(project, dict) or not project.get("query"):
+                raise ValueError("Missing query")
+            query = project["query"]
+            pages = _bulk_pages(project, query)
+
+            generate_start = time.perf_counter()
+            entry = _cached_design_system(query, project.get("project_name"), pages, render=True,
+                                          use_cache=use_cache, generator=generator)
+            design_system = entry["design_system"]
+            write_start = time.perf_counter()
+            persisted = _write_files(_design_system_dir(design_system, output_dir), entry["files"])
+        except (OSError, ValueError) as e:
+            # One bad project (e.g. a file where its folder should be) must not abort the rest
+            errors.append({"item": position, "error": str(e), "project": project})
+            continue
+
+        items.append({
+            "project_name": design_system["project_name"],
+            "query": query,
+            "pages": [page for page, _ in pages],
+            "cached": entry["cached"],
+            "design_system_dir": persisted["design_system_dir"],
+            "files": persisted["created_files"],
+            "unchanged_files": persisted["unchanged_files"],
+            "generate_ms": round((write_start - generate_start) * 1000, 3),
+            "write_ms": round((time.perf_counter() - write_start) * 1000, 3)
+        })
+
+    return {
+        "status": "success" if not errors else "partial",
+        "projects": len(items),
+        "files": sum(len(item["files"]) for item in items),
+        "unchanged_files": sum(len(item["unchanged_files"]) for item in items),
+        "total_ms": round((time.perf_counter() - start) * 1000, 3),
+        "items": items,
+        "errors": errors
+    }
+
+
 # ============ CLI SUPPORT ============
 if __name__ == "__main__":
     import argparse
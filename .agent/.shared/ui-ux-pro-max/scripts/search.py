@@ -3,26 +3,65 @@
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --stack all|react,swiftui,react-native
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py --bulk design-systems.json [-o OUTPUT_DIR] [--json]
+       python search.py --batch queries.jsonl [--domain <domain>] [--stack <stack>]
+       python search.py --serve [--socket PATH]
+       python search.py --build-index
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
+         all (federated: merged top-k across every domain, each hit tagged with its domain)
 Stacks: html-tailwind, react, nextjs
+        all, or a comma-separated list (results grouped by stack)
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+  --bulk       Persist many projects and pages from one manifest (JSON, or YAML with PyYAML):
+      {"output_dir": "out", "projects": [{"query": "saas dashboard", "project_name": "Acme",
+                                          "pages": ["dashboard", {"name": "pricing", "query": "pricing plans"}]}]}
+
+Batch mode: one query per input line ("-" reads stdin), one JSON result per output line.
+  A line is either a JSON object {"query", "domain", "stack", "max_results", "scoring"},
+  a JSON string, or plain query text.
+
+Daemon: --serve keeps all indexes warm and answers over a Unix socket; plain,
+  stack and batch searches use it automatically when it is running (--no-daemon to skip).
+  Each copy of the kit gets its own socket, and a daemon serving other data is never used.
+
+Custom corpora: --corpus DIR (repeatable, or $UI_PRO_MAX_CORPORA) registers every CSV under DIR
+  that has a <name>.manifest.json beside it, e.g.
+      {"type": "domain", "search_cols": ["Rule", "Keywords"], "output_cols": ["Rule", "Do", "Don't"]}
+  Registered domains and stacks are indexed and searched like the bundled ones. Searches with
+  --corpus run in-process, since a daemon only sees corpora from its own $UI_PRO_MAX_CORPORA.
+
+Design system cache: generated design systems are cached under .index/design-systems/, keyed on
+  the query, project, pages, data file contents and generator version; --no-cache (or
+  $UI_PRO_MAX_DESIGN_CACHE=0) regenerates. Persisted files whose content is unchanged are not rewritten.
+
+Indexes: each CSV is compiled once into .index/ and reloaded until the CSV changes.
+  --build-index  Precompile indexes for all domains and stacks, and a memory-mapped
+                 row store (.rows) for every CSV under data/
+
+Scoring: --scoring bm25 (default, $UI_PRO_MAX_SCORING) indexes the search columns as one
+  text; --scoring bm25f weights and length-normalizes each column separately.
 """
 
-import argparse
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+import sys
+
+# A plain search asks a running daemon before argparse and core are imported
+# (see daemon_search); core, daemon and design_system are otherwise imported
+# by the code paths that use them
 
 
 def format_output(result):
     """Format results for Claude consumption (token-optimized)"""
     if "error" in result:
         return f"Error: {result['error']}"
+    if isinstance(result.get("results"), dict):
+        return format_grouped_output(result)
 
     output = []
     if result.get("stack"):
@@ -45,13 +84,153 @@ def format_output(result):
     return "\n".join(output)
 
 
+def format_grouped_output(result):
+    """Format search_stacks() results, one section per stack"""
+    sections = []
+    for stack, rows in result["results"].items():
+        sections.append(format_output({
+            "stack": stack, "query": result["query"], "file": result["files"][stack], "count": len(rows), "results": rows
+        }))
+    for stack, error in result.get("errors", {}).items():
+        sections.append(f"## {stack}\nError: {error}\n")
+    return "\n".join(sections)
+
+
+def read_batch(source):
+    """Parse batch input lines into search_many() requests"""
+    import json
+    requests = []
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            item = line
+        requests.append(item if isinstance(item, (dict, str)) else str(item))
+    return requests
+
+
+def format_bulk_summary(summary):
+    """Render a generate_bulk() summary, one line per project"""
+    lines = [f"✅ Generated {summary['projects']} design system(s), {summary['files']} file(s) "
+             f"({summary['unchanged_files']} unchanged) in {summary['total_ms']:.1f} ms"]
+    for item in summary["items"]:
+        pages = f" + {', '.join(item['pages'])}" if item["pages"] else ""
+        cached = " (cached)" if item["cached"] else ""
+        lines.append(f"   📄 {item['design_system_dir']} (MASTER{pages}) "
+                     f"generate {item['generate_ms']:.1f} ms{cached}, write {item['write_ms']:.1f} ms")
+    for error in summary["errors"]:
+        lines.append(f"❌ Item {error['item']}: {error['error']}")
+    return "\n".join(lines)
+
+
+def answer(requests, use_daemon=True, socket_path=None):
+    """Answer search_many() requests, through the daemon when one is running"""
+    if use_daemon:
+        import daemon
+        reply = daemon.request(requests, socket_path)
+        if isinstance(reply, list):
+            return reply
+    from core import search_many
+    return search_many(requests)
+
+
+_DAEMON_OPTIONS = {"-d": "domain", "--domain": "domain", "-s": "stack", "--stack": "stack",
+                   "-n": "max_results", "--max-results": "max_results", "--scoring": "scoring", "--socket": "socket"}
+
+
+def daemon_search(argv):
+    """Print a plain domain or stack search answered by this install's daemon; False to run the full CLI
+
+    Only `"<query>" [-d/-s/-n/--scoring/--socket VALUE] [--json]` is handled
+    here. Any other argument, an unreachable daemon or an error reply leaves
+    the search (and its error reporting) to argparse and core.
+    """
+    request, as_json = {}, False
+    args = iter(argv)
+    for arg in args:
+        if arg == "--json":
+            as_json = True
+        elif arg in _DAEMON_OPTIONS:
+            value = next(args, None)
+            if value is None:
+                return False
+            request[_DAEMON_OPTIONS[arg]] = value
+        elif not arg.startswith("-") and "query" not in request:
+            request["query"] = arg
+        else:
+            return False
+    if "max_results" in request:
+        if not request["max_results"].isdigit():
+            return False
+        request["max_results"] = int(request["max_results"])
+    socket_path = request.pop("socket", None)
+    if not request.get("query"):
+        return False
+
+    import daemon
+    result = daemon.request(request, socket_path)
+    if not isinstance(result, dict) or "error" in result or result.get("errors"):
+        return False
+    if as_json:
+        import json
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(format_output(result))
+    return True
+
+
+def run_batch(path, domain, stack, max_results, use_daemon=True, socket_path=None, scoring=None):
+    """Answer every query in a batch file (or stdin) and print JSON lines"""
+    if path == "-":
+        items = read_batch(sys.stdin)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            items = read_batch(f)
+
+    requests = []
+    for item in items:
+        item = item if isinstance(item, dict) else {"query": item}
+        item.setdefault("max_results", max_results)
+        if scoring:
+            item.setdefault("scoring", scoring)
+        if stack and "domain" not in item:
+            item.setdefault("stack", stack)
+        elif domain:
+            item.setdefault("domain", domain)
+        requests.append(item)
+
+    import json
+    for result in answer(requests, use_daemon, socket_path):
+        print(json.dumps(result, ensure_ascii=False))
+
+
 if __name__ == "__main__":
+    if daemon_search(sys.argv[1:]):
+        sys.exit(0)
+
+    import argparse
+    from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, SCORING_MODES, build_indexes, discover_corpora, parse_stacks
+
+    # Custom corpora must be registered before --domain/--stack choices are built
+    corpus_parser = argparse.ArgumentParser(add_help=False)
+    corpus_parser.add_argument("--corpus", action="append", default=[])
+    for corpus_dir in corpus_parser.parse_known_args()[0].corpus:
+        try:
+            discover_corpora(corpus_dir)
+        except (OSError, ValueError) as e:
+            corpus_parser.exit(1, f"Error: {e}\n")
+
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
-    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
-    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()) + ["all"], help="Search domain ('all' ranks hits across every domain)")
+    parser.add_argument("--stack", "-s", type=str, default=None, help=f"Stack-specific search: {', '.join(AVAILABLE_STACKS)}, 'all', or a comma-separated list")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--corpus", action="append", default=[], metavar="DIR", help="Register CSVs with a <name>.manifest.json under DIR (repeatable)")
+    parser.add_argument("--scoring", choices=SCORING_MODES, default=None, help="Ranking: flat bm25 or field-weighted bm25f (default: $UI_PRO_MAX_SCORING or bm25)")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
@@ -60,20 +239,65 @@ if __name__ == "__main__":
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    parser.add_argument("--bulk", type=str, default=None, metavar="MANIFEST", help="Persist design systems for every project/page in a JSON or YAML manifest")
+    parser.add_argument("--no-cache", action="store_true", help="Regenerate design systems even when a cached one matches")
+    # Batch mode
+    parser.add_argument("--batch", "-b", type=str, default=None, metavar="FILE", help="Answer one query per line of FILE (JSONL, '-' for stdin)")
+    # Daemon
+    parser.add_argument("--serve", action="store_true", help="Run a search daemon that keeps all indexes warm in memory")
+    parser.add_argument("--socket", type=str, default=None, help="Daemon socket path (default: $UI_PRO_MAX_SOCKET or a per-user temp path)")
+    parser.add_argument("--no-daemon", action="store_true", help="Search in-process even if a daemon is running")
+    # Index maintenance
+    parser.add_argument("--build-index", action="store_true", help="Precompile search indexes and row stores for all data CSVs")
 
     args = parser.parse_args()
+    # A running daemon only knows the corpora from its own environment; --corpus
+    # domains and stacks (and "all"/auto-detection over them) must be searched here
+    use_daemon = not args.no_daemon and not args.corpus
+    if args.stack:
+        unknown = [stack for stack in parse_stacks(args.stack) if stack not in AVAILABLE_STACKS]
+        if unknown or not parse_stacks(args.stack):
+            parser.error(f"argument --stack/-s: invalid choice: {', '.join(unknown) or repr(args.stack)} (choose from {', '.join(AVAILABLE_STACKS)}, all)")
 
+    if args.build_index:
+        built = build_indexes(args.scoring)
+        print(f"✅ Built {len(built)} index files")
+        for path in built:
+            print(f"   📄 {path}")
+    elif args.serve:
+        import daemon
+        try:
+            daemon.serve(args.socket)
+        except OSError as e:
+            parser.exit(1, f"Error: {e}\n")
+    elif args.bulk:
+        from design_system import generate_bulk, load_bulk_manifest
+        try:
+            manifest = load_bulk_manifest(args.bulk)
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"Error: {e}\n")
+        import json
+        summary = generate_bulk(manifest["projects"], args.output_dir or manifest.get("output_dir"), use_cache=not args.no_cache)
+        print(json.dumps(summary, indent=2, ensure_ascii=False) if args.json else format_bulk_summary(summary))
+        if summary["errors"]:
+            sys.exit(1)
+    elif args.batch:
+        run_batch(args.batch, args.domain, args.stack, args.max_results, use_daemon, args.socket, args.scoring)
+    elif not args.query:
+        parser.error("the following arguments are required: query")
     # Design system takes priority
-    if args.design_system:
+    elif args.design_system:
+        from design_system import generate_design_system
         result = generate_design_system(
             args.query, 
             args.project_name, 
             args.format,
             persist=args.persist,
             page=args.page,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            use_cache=not args.no_cache,
+            out=sys.stdout
         )
-        print(result)
         
         # Print persistence confirmation
         if args.persist:
@@ -90,7 +314,8 @@ if __name__ == "__main__":
             print("=" * 60)
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        request = {"query": args.query, "stack": args.stack, "max_results": args.max_results, "scoring": args.scoring}
+        result = answer([request], use_daemon, args.socket)[0]
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -98,7 +323,8 @@ if __name__ == "__main__":
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        request = {"query": args.query, "domain": args.domain, "max_results": args.max_results, "scoring": args.scoring}
+        result = answer([request], use_daemon, args.socket)[0]
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))